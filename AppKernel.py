@@ -414,22 +414,23 @@ class AppKernel(MapFileManagerProtocol):
         _err, _errors = False, []
         fields = self.get_needed_field_names(alias=self.get_feature_type())
 
-        column_names = []
-        needed = []
+        # repeated columns are checked only once (first field that uses it)
+        column_needed = {}
         for field_key in fields:
-            field_name = fields[field_key]['name']
-            needed = fields[field_key]['needed']
+            column_needed.setdefault(fields[field_key]['name'], fields[field_key]['needed'])
 
-            if field_name not in column_names:
-                __err, __errors = GrassCoreAPI.check_basic_columns(map_name=map_name, columns=[field_name], needed=[needed])
-                self.summary.set_process_line(msg_name='check_basic_columns', check_error=__err,
-                                              map_name=map_name, columns=[field_name], needed=[needed])
+        # all the columns are checked with one read of the map columns
+        results = GrassCoreAPI.check_basic_columns_by_column(map_name=map_name, columns=list(column_needed),
+                                                             needed=list(column_needed.values()))
 
-                _errors += __errors
-                if needed:
-                    _err |= __err
+        for field_name, __err, __errors in results:
+            needed = column_needed[field_name]
+            self.summary.set_process_line(msg_name='check_basic_columns', check_error=__err,
+                                          map_name=map_name, columns=[field_name], needed=[needed])
 
-                column_names.append(field_name)
+            _errors += __errors
+            if needed:
+                _err |= __err
 
         self.append_error(msgs=_errors, typ='other')
 
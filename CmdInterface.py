@@ -1,4 +1,6 @@
 import argparse
+import os
+import shutil
 import subprocess
 import sys
 import ui
@@ -12,11 +14,63 @@ from InterfaceApp import InterfaceApp
 from utils.SummaryInfo import SummaryInfo
 
 
-def add_grass_to_path():
+GRASS_EXECUTABLE = 'grass78'
+GRASS_PATH_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'geolinkage')
+GRASS_INSTALL_PREFIXES = ('/usr/lib', '/usr/local/lib', '/opt')  # usual parent folders of '<executable>' installs
+
+
+def _is_grass_path(path: str):
+    return os.path.isdir(os.path.join(path, 'etc', 'python'))
+
+
+def get_grass_path(executable: str = GRASS_EXECUTABLE):
+    # a GRASS shell exports its install path in GISBASE, and packaged installs use well-known folders.
+    # Both are checked before running any subprocess
+    gisbase = os.environ.get('GISBASE')
+    if gisbase and _is_grass_path(gisbase):
+        return gisbase
+
+    for prefix in GRASS_INSTALL_PREFIXES:
+        grass_path = os.path.join(prefix, executable)
+        if _is_grass_path(grass_path):
+            return grass_path
+
+    # the install path is cached in a file keyed by the executable stat, so 'grass --config path' runs only
+    # when GRASS is installed or updated
+    executable_path = shutil.which(executable)
+    if executable_path is None:
+        return None
+
+    executable_stat = os.stat(executable_path)
+    cache_key = '{}_{}_{}'.format(executable, int(executable_stat.st_mtime), executable_stat.st_size)
+    cache_file = os.path.join(GRASS_PATH_CACHE_DIR, 'grass_path_{}'.format(cache_key))
+
     try:
-        CONFIG_GRASS_PATH = subprocess.run(["grass78", "--config", "path"], shell=True)
-    except FileNotFoundError as e:
-        CONFIG_GRASS_PATH = None
+        with open(cache_file) as f:
+            return f.read().strip()
+    except OSError:
+        pass
+
+    try:
+        grass_config = subprocess.run([executable_path, '--config', 'path'], capture_output=True, text=True,
+                                      check=True)
+    except (FileNotFoundError, subprocess.CalledProcessError):
+        return None
+
+    grass_path = grass_config.stdout.strip()
+
+    try:
+        os.makedirs(GRASS_PATH_CACHE_DIR, exist_ok=True)
+        with open(cache_file, 'w') as f:
+            f.write(grass_path)
+    except OSError:  # without cache the path is searched again the next time
+        pass
+
+    return grass_path
+
+
+def add_grass_to_path():
+    CONFIG_GRASS_PATH = get_grass_path()
 
     if CONFIG_GRASS_PATH is not None:
         sys.path.append(CONFIG_GRASS_PATH + '/etc/python')
@@ -9,6 +9,10 @@ class Check(ABC):
     ----------
     errors : list
         List of errors found during the check.
+
+    geo : GeoChecker
+        Reference to the GeoChecker that runs the check. It is shared by all the checks, so they can
+        read the arcs and nodes data directly instead of storing their own copies.
     
     Methods:
     --------
@@ -35,6 +39,11 @@ class Check(ABC):
         Usually used to perform the check over an arc using the previously
         setup data structures.
 
+    arc_check_bulk_operation(arc_arrays)
+        Optional method called by GeoChecker before the arcs check loop, receiving all the arcs as
+        parallel numpy arrays. If it returns True, the check is excluded from the per-arc loop.
+        By default it returns False.
+
     node_check_operation(node_id, node)
         Abstract method called by GeoChecker.
         Usually used to perform the check over a node using the previously
@@ -49,6 +58,9 @@ class Check(ABC):
         Abstract method to plot the results of the check. Interacts with a Visualizator instance,
         which contains all the methods to write to files and visualize the information in different ways.
 
+    set_geo(geo)
+        Method to set the shared GeoChecker reference.
+
     get_errors()
         Method to get the errors found during the check.
         Meant to be called after the checks are finished.
@@ -64,6 +76,7 @@ class Check(ABC):
         self.errors = []
         self.name = None
         self.description = None
+        self.geo = None
 
     # Space for auxiliary functions
 
@@ -110,6 +123,9 @@ class Check(ABC):
     def arc_check_operation(self, arc_id, arc):
         pass
 
+    def arc_check_bulk_operation(self, arc_arrays):
+        return False
+
     @abstractmethod
     def node_check_operation(self, node_id, node):
         pass
@@ -122,6 +138,9 @@ class Check(ABC):
     def plot(self, visualizator):
         pass
 
+    def set_geo(self, geo):
+        self.geo = geo
+
     def get_errors(self):
         return self.errors
     
@@ -1,7 +1,13 @@
+from collections import namedtuple
+
+from processors.Models import ArcStore, NodeStore
 from utils.SummaryInfo import SummaryInfo
 from utils.Errors import ErrorManager
 from utils.Visualizer import Visualizer
 
+Arc = namedtuple('Arc', ['type_id', 'src_id', 'dst_id'])
+ArcArrays = namedtuple('ArcArrays', ['type_ids', 'src_ids', 'dst_ids', 'src_type_ids', 'dst_type_ids'])
+
 class GeoChecker:
     """
     GeoChecker class is the main class for the GeoChecker postprocessor. It is in charge of managing the checks,
@@ -20,17 +26,23 @@ class GeoChecker:
         Path to the directory where the visualizations and data of the checks will be saved.
     
     arcs : dict
-        Dictionary containing the arcs data.
+        Dictionary containing the arcs data. Each arc is stored as an 'Arc' namedtuple, so checks
+        read its fields by attribute (arc.type_id, arc.src_id, arc.dst_id).
         {Arc ID :
-            {
-                'type_id': geometry type ID of the arc,
-                'src_id': source node ID (or None),
-                'dst_id': destination node ID (or None)
-            }
+            Arc(
+                type_id: geometry type ID of the arc,
+                src_id: source node ID (or None),
+                dst_id: destination node ID (or None)
+            )
         }
     
-    nodes : dict
-        Dictionary containing the nodes data with the following structure.
+    arc_arrays : ArcArrays
+        Same arcs data stored as parallel numpy arrays (one position per arc), used by the checks
+        that implement 'arc_check_bulk_operation'. Missing node IDs are stored as -1, and
+        'src_type_ids'/'dst_type_ids' hold the type ID of each endpoint node (-1 if it is unknown).
+
+    nodes : NodeStore
+        Nodes data in columns (processors.Models.NodeStore), accessed like a dictionary with the following structure.
         {Node ID : 
             {   
                 'type_id': geometry type ID, 
@@ -63,7 +75,11 @@ class GeoChecker:
     Methods:
     --------
     set_arcs_and_nodes(arcs, nodes):
-        Set the arcs and nodes data to be used in the checks.
+        Set the arcs and nodes data to be used in the checks. Arcs are converted to 'Arc' namedtuples
+        and to the 'arc_arrays' columnar structure.
+
+    make_arc_arrays(arcs):
+        Build the 'arc_arrays' parallel numpy arrays from the arc store columns and the node types.
     
     set_consolidate_cells(cells):
         Set the consolidated cells data to be used in the checks.
@@ -93,7 +109,8 @@ class GeoChecker:
         Loop through the nodes data and perform the checks for the nodes.
 
     check_arcs_loop():
-        Loop through the arcs data and perform the checks for the arcs.
+        Loop through the arcs data and perform the checks for the arcs. Checks that resolve all arcs at once
+        through 'arc_check_bulk_operation' skip the per-arc loop.
     
     check_cells_loop():
         Loop through the cells data and perform the checks for the cells.
@@ -114,8 +131,11 @@ class GeoChecker:
 
     def __init__(self, checks, config, folder_path=None):
         self.checks = checks
+        for check in self.checks:
+            check.set_geo(self)
 
         self.arcs = None
+        self.arc_arrays = None
         self.nodes = None
         self.cells = None
 
@@ -132,9 +152,17 @@ class GeoChecker:
         self.folder_path = path
         self.visualizer.set_result_path(path)
         
-    def set_arcs_and_nodes(self, arcs, nodes):
-        self.arcs = arcs
-        self.nodes = nodes
+    def set_arcs_and_nodes(self, arcs: ArcStore, nodes: NodeStore):
+        self.arcs = {arc_id: Arc(type_id, None if src_id == -1 else src_id, None if dst_id == -1 else dst_id)
+                     for arc_id, type_id, src_id, dst_id in zip(arcs.ids.tolist(), arcs.type_id.tolist(),
+                                                                 arcs.src_id.tolist(), arcs.dst_id.tolist())}
+        self.nodes = nodes  # shared with GeoKernel (read only here)
+        self.arc_arrays = self.make_arc_arrays(arcs)
+
+    def make_arc_arrays(self, arcs: ArcStore):
+        # arc columns are taken as they are, node types are gathered by position in the node store
+        return ArcArrays(arcs.type_id, arcs.src_id, arcs.dst_id,
+                         self.nodes.get_type_ids(arcs.src_id), self.nodes.get_type_ids(arcs.dst_id))
     
     def set_consolidate_cells(self, cells):
         self.cells = cells
@@ -181,8 +209,10 @@ class GeoChecker:
         self.summary.set_process_line("perform_check_node", check_error = False)
 
     def check_arcs_loop(self):
+        loop_checks = [check for check in self.checks if not check.arc_check_bulk_operation(self.arc_arrays)]
+
         for arc_id, arc in self.arcs.items():
-            for check in self.checks:
+            for check in loop_checks:
                 check.arc_check_operation(arc_id, arc)
         
         self.summary.set_process_line("perform_check_arc", check_error = False)
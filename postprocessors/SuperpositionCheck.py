@@ -1,6 +1,48 @@
 from postprocessors.Check import Check
 import numpy as np
 
+try:
+    from numba import njit
+except ModuleNotFoundError:
+    njit = None
+
+
+def connection_pairs(src_type_ids, dst_type_ids, src_ids, dst_ids, base_type_id, secondary_type_id):
+    """
+        Returns two aligned arrays (base node IDs, secondary node IDs) with every arc that connects a node of
+        type 'base_type_id' with a node of type 'secondary_type_id', in any direction.
+        Compiled with numba when the package is available, otherwise it uses numpy boolean masks.
+    """
+    mask_fwd = (src_type_ids == base_type_id) & (dst_type_ids == secondary_type_id)
+    mask_rev = (src_type_ids == secondary_type_id) & (dst_type_ids == base_type_id)
+
+    base_ids = np.concatenate((src_ids[mask_fwd], dst_ids[mask_rev]))
+    secondary_ids = np.concatenate((dst_ids[mask_fwd], src_ids[mask_rev]))
+    return base_ids, secondary_ids
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _connection_pairs_jit(src_type_ids, dst_type_ids, src_ids, dst_ids, base_type_id, secondary_type_id):
+        n = src_ids.shape[0]
+        base_ids = np.empty(n, dtype=np.int64)
+        secondary_ids = np.empty(n, dtype=np.int64)
+
+        k = 0
+        for i in range(n):
+            if src_type_ids[i] == base_type_id and dst_type_ids[i] == secondary_type_id:
+                base_ids[k] = src_ids[i]
+                secondary_ids[k] = dst_ids[i]
+                k += 1
+            elif src_type_ids[i] == secondary_type_id and dst_type_ids[i] == base_type_id:
+                base_ids[k] = dst_ids[i]
+                secondary_ids[k] = src_ids[i]
+                k += 1
+
+        return base_ids[:k], secondary_ids[:k]
+
+    connection_pairs = _connection_pairs_jit
+
 class SuperpositionCheck(Check):
     """
     SuperpositionCheck class is a subclass of Check class.
@@ -24,8 +66,9 @@ class SuperpositionCheck(Check):
     secondary_names : dict
         Dictionary to store the names of the secondary features and the amount of cells
         it has in the linkage file.
-    nodes : dict
-        Dictionary to store the nodes data.
+    geo : GeoChecker
+        Shared reference to the GeoChecker running this check (see Check), used to read
+        the nodes data without keeping a copy per check.
     connections : dict
         Dictionary to store all the base features and the secondary features
         they are connected to.
@@ -40,7 +83,10 @@ class SuperpositionCheck(Check):
         is already in the dictionary and if the super element is already in the base element
         dictionary.
     make_errors()
-        Converts the connection_error dictionary into a list of errors strings.
+        Converts the connection_error dictionary into a list of errors strings, one per base element.
+    get_errors()
+        Builds the errors list from the accumulated connection errors (only once, after all the
+        cells were checked) and returns it.
     set_connection(base_info, secondary_info)
         Set the connection between the base and secondary features.
     check_connection(base_name, secondary_name)
@@ -65,11 +111,14 @@ class SuperpositionCheck(Check):
     arc_init_operation(arc_id, arc)
         Does nothing.
     node_init_operation(node_id, node)
-        Saves the information for all the relevant nodes.
+        Registers the names of all the relevant nodes.
     cell_init_operation(cell_id, cell)
         Does nothing.
     arc_check_operation(arc_id, arc)
-        Builds the connections between the base and secondary features.
+        Does nothing (the connections are built by arc_check_bulk_operation).
+    arc_check_bulk_operation(arc_arrays)
+        Builds the connections between the base and secondary features for all the arcs
+        at once, using boolean masks over the arc arrays.
     node_check_operation(node_id, node)
         Does nothing.
     cell_check_operation(cell_id, cell)
@@ -90,7 +139,6 @@ class SuperpositionCheck(Check):
 
         self.base_names = {}
         self.secondary_names = {}
-        self.nodes = {}
 
         self.connections = {}
         self.connection_error = {} 
@@ -105,8 +153,12 @@ class SuperpositionCheck(Check):
         self.connection_error[base_element][super_element] += area
 
     def make_errors(self):
-        for base, secondaries in self.connection_error.items():
-            self.errors.append(f"El elemento {base} del tipo {self.base_feature} no está conectado a los elementos {secondaries} de tipo {self.secondary_feature}.")
+        self.errors = [f"El elemento {base} del tipo {self.base_feature} no está conectado a los elementos {secondaries} de tipo {self.secondary_feature}."
+                       for base, secondaries in self.connection_error.items()]
+
+    def get_errors(self):
+        self.make_errors()
+        return self.errors
 
     def set_connection(self, base_info, secondary_info):
         if not self.connections.get(base_info["name"]):
@@ -127,20 +179,20 @@ class SuperpositionCheck(Check):
             return error_list
         
         errors = {}
-        for base in self.connection_error.keys():
-            for secondary in self.connection_error[base].keys():
-                errors[f"{base}-{secondary}"] = {"amount_error": self.connection_error[base][secondary],
-                                                 "percentaje_error_over_primary": self.connection_error[base][secondary] / self.base_names[base],
-                                                 "percentaje_error_over_secondary": self.connection_error[base][secondary] / self.secondary_names[secondary]}
+        for base, secondaries in self.connection_error.items():
+            for secondary, amount in secondaries.items():
+                errors[f"{base}-{secondary}"] = {"amount_error": amount,
+                                                 "percentaje_error_over_primary": amount / self.base_names[base],
+                                                 "percentaje_error_over_secondary": amount / self.secondary_names[secondary]}
 
         #sort the errors by the amount of errors
         errors = dict(sorted(errors.items(), key=lambda item: item[1]["amount_error"], reverse=True))
-        longest_base_name = max([len(error.split("-")[0]) for error in errors.keys()])-1
-        longest_secondary_name = max([len(error.split("-")[1]) for error in errors.keys()])-1
+        longest_base_name = max([len(error.split("-")[0]) for error in errors])-1
+        longest_secondary_name = max([len(error.split("-")[1]) for error in errors])-1
 
-        for error in errors.keys():
+        for error, info in errors.items():
             [base, secondary] = error.split('-')
-            error_txt = f"{self.base_feature}: {base}{" "*(longest_base_name-len(base) + 1)}|-| {self.secondary_feature}: {secondary}{" "*(longest_secondary_name-len(secondary) + 1)}-> {errors[error]['amount_error']} area de error,  {errors[error]['percentaje_error_over_primary']*100:.2f}% del {self.base_feature}, {errors[error]['percentaje_error_over_secondary']*100:.2f}% del {self.secondary_feature}."
+            error_txt = f"{self.base_feature}: {base}{" "*(longest_base_name-len(base) + 1)}|-| {self.secondary_feature}: {secondary}{" "*(longest_secondary_name-len(secondary) + 1)}-> {info['amount_error']} area de error,  {info['percentaje_error_over_primary']*100:.2f}% del {self.base_feature}, {info['percentaje_error_over_secondary']*100:.2f}% del {self.secondary_feature}."
             error_list.append(error_txt)
         
         return error_list
@@ -182,9 +234,9 @@ class SuperpositionCheck(Check):
         # Fill the matrix with the amount of cells in error for each connection
         for base, secondaries in self.connection_error.items():
             i = base_names.index(base)
-            for secondary in secondaries:
+            for secondary, amount in secondaries.items():
                 j = secondary_names.index(secondary)
-                magnitud = self.connection_error[base][secondary] / self.secondary_names[secondary]
+                magnitud = amount / self.secondary_names[secondary]
                 matrix[i][j] = magnitud
                 
         return matrix, base_names, secondary_names
@@ -216,7 +268,6 @@ class SuperpositionCheck(Check):
     def node_init_operation(self, node_id, node):
         type_id = node['type_id']
         if type_id == self.base_feature_type_id or type_id == self.secondary_feature_type_id:
-            self.nodes[node_id] = node
             if type_id == self.base_feature_type_id:
                 self.base_names[node["name"]] = 0
                 self.connections[node["name"]] = dict()
@@ -227,21 +278,33 @@ class SuperpositionCheck(Check):
         pass
 
     def arc_check_operation(self, arc_id, arc):
-        src_id = arc["src_id"]
-        dst_id = arc["dst_id"]
+        pass
+
+    def arc_check_bulk_operation(self, arc_arrays):
+        base_ids, secondary_ids = connection_pairs(arc_arrays.src_type_ids, arc_arrays.dst_type_ids,
+                                                   arc_arrays.src_ids, arc_arrays.dst_ids,
+                                                   self.base_feature_type_id, self.secondary_feature_type_id)
 
-        if (src_id and dst_id) and (src_id in self.nodes and dst_id in self.nodes):
-            if self.nodes[src_id]["type_id"] == self.base_feature_type_id and self.nodes[dst_id]["type_id"] == self.secondary_feature_type_id:
-                self.set_connection(self.nodes[src_id], self.nodes[dst_id])
-            elif self.nodes[src_id]["type_id"] == self.secondary_feature_type_id and self.nodes[dst_id]["type_id"] == self.base_feature_type_id:
-                self.set_connection(self.nodes[dst_id], self.nodes[src_id])
+        nodes = self.geo.nodes
+        for base_id, secondary_id in zip(base_ids.tolist(), secondary_ids.tolist()):
+            self.set_connection(nodes[base_id], nodes[secondary_id])
+
+        return True
 
     def node_check_operation(self, node_id, node):
         pass
 
     def cell_check_operation(self, cell_id, cell):
         base_element_data = self.get_cell_feature_data(cell, self.base_feature)
+        if not base_element_data:
+            return
+
         secondary_element_data = self.get_cell_feature_data(cell, self.secondary_feature)
+        if not secondary_element_data:
+            # without superposition only the base area is accumulated
+            for base in base_element_data:
+                self.base_names[base['name']] += base['area']
+            return
 
         for base in base_element_data:
             base_name = base['name']
@@ -255,7 +318,5 @@ class SuperpositionCheck(Check):
                     if self.connections.get(base_name):
                         self.connections[base_name][secondary_name] += float(secondary['area'])
         
-        self.make_errors()
-        
                     
 
@@ -1,3 +1,4 @@
+import sys
 from abc import abstractmethod, ABCMeta
 
 from grass.pygrass.vector import VectorTopo
@@ -85,6 +86,19 @@ class FeatureProcess(MapFileManagerProtocol, metaclass=ABCMeta):
             The 'linkage_name' parameter identifies the final grid and the 'snap' parameter allows you to do more
             detailed (but slower) intersection.
 
+        _read_inter_map_areas(self, inter_map_name)
+            Reads the intersection map 'inter_map_name' with one query. Returns a list of tuples (feature name,
+            cell ID, cell row, cell column, area), one for each intersection geometry. The areas are computed for
+            all the geometries at once (v.to.db).
+
+        _set_cells_from_rows(self, rows, map_name, cell_type)
+            Stores the cell-feature relationship of the intersection 'rows' (see '_read_inter_map_areas') in 'cells'
+            and 'cells_by_map', in one sequential pass (same result as '_set_cell' for each row).
+
+        _make_row_cell_data(row, map_name, name_cache)
+            Converts one intersection row into (feature name, cell row, cell column, cell data). Processors reading
+            other columns than '_read_inter_map_areas' override it (see RiverProcess).
+
         make_grid_cell(self)
             Stores cell-feature relationship using the intersection between a vector map and groundwater grid map.
 
@@ -259,6 +273,71 @@ class FeatureProcess(MapFileManagerProtocol, metaclass=ABCMeta):
 
         return area_targets_sorted  # (key, data_key)
 
+    def _read_inter_map_areas(self, inter_map_name):
+        # field names in the intersection map ('a_': feature map, 'b_': linkage map)
+        fields = self.get_needed_field_names(alias=self.get_feature_type())
+        field_feature_name = 'a_' + fields['main']['name']
+        col_field = 'b_' + self.config.fields_db['linkage']['col_in']
+        row_field = 'b_' + self.config.fields_db['linkage']['row_in']
+
+        # areas are computed for all the intersection geometries at once and read with the other attributes
+        area_field = GrassCoreAPI.add_area_column(map_name=inter_map_name, column='inter_area')
+
+        inter_map = VectorTopo(inter_map_name)
+        inter_map.open('r')
+
+        # one SELECT for all the intersection geometries (geometries without category have no row)
+        inter_attrs = GrassCoreAPI.get_attributes_by_cat(vector_map=inter_map, key_column='cat',
+                                                         columns=[field_feature_name, 'b_cat', row_field, col_field,
+                                                                  area_field])
+
+        inter_map.close()
+
+        return list(inter_attrs.values())
+
+    @staticmethod
+    def _make_row_cell_data(row, map_name, name_cache):
+        # row from '_read_inter_map_areas' => (feature name, cell row, cell column, cell data)
+        feature_name, cell_area_id, area_row, area_col, feature_area = row
+
+        # 'cell_area_id': id from cell in linkage map
+        feature_name = name_cache.setdefault(feature_name, feature_name)
+
+        data = {
+            'area': feature_area,
+            'cell_id': cell_area_id,
+            'name': feature_name,
+            'map_name': map_name
+        }
+
+        return feature_name, area_row, area_col, data
+
+    def _set_cells_from_rows(self, rows, map_name, cell_type):
+        # same as calling '_set_cell' for each row, with the lookups bound to locals
+        by_field = self.get_order_criteria_name()
+        cells = self.cells
+        cells_by_map_list = self.cells_by_map[map_name]  # order cells by map name (will be used in DS)
+
+        # names repeat across many cells, only one string object is kept for each one
+        map_name = sys.intern(map_name)
+        name_cache = {}
+        make_row_cell_data = self._make_row_cell_data
+
+        for row in rows:
+            feature_name, area_row, area_col, data = make_row_cell_data(row, map_name, name_cache)
+
+            cell = cell_type(area_row, area_col)
+
+            cell_data = cells.get(cell)
+            if cell_data is None:
+                cells[cell] = {feature_name: data}
+            elif feature_name in cell_data:
+                cell_data[feature_name][by_field] += data[by_field]
+            else:
+                cell_data[feature_name] = data
+
+            cells_by_map_list.append(cell)
+
     def _set_cell(self, cell, area_name, data, by_field='area'):
         if cell in self.cells:
             # watch if exist catchment
@@ -348,8 +427,9 @@ class FeatureProcess(MapFileManagerProtocol, metaclass=ABCMeta):
         _err = False
 
         # select only features with names
-        if self.get_needed_field_names(alias=self.get_feature_type())['main']:
-            col_query = self.get_needed_field_names(alias=self.get_feature_type())['main']['name']
+        main_field = self.get_needed_field_names(alias=self.get_feature_type())['main']
+        if main_field:
+            col_query = main_field['name']
             GrassCoreAPI.extract_map_with_condition(map_name, map_name + '_extract', col_query, '', '!=')
             map_name = map_name + '_extract'
 
@@ -412,7 +492,7 @@ class FeatureProcess(MapFileManagerProtocol, metaclass=ABCMeta):
         return ret
 
     def import_maps(self, verbose: bool = False, quiet: bool = True):
-        map_names = [m for m in self.get_map_names(only_names=False, with_main_file=True, imported=False) if m[1]]
+        map_names = self.get_map_names(only_names=False, with_main_file=True, imported=False, non_null_only=True)
 
         for map_name, path_name, inter_name in map_names:
             _err, _errors = self.make_vector_map(map_name=map_name)
@@ -434,7 +514,7 @@ class FeatureProcess(MapFileManagerProtocol, metaclass=ABCMeta):
         return self.check_errors(types=[self.get_feature_type()]), self.get_errors()
 
     def set_origin_in_map(self):
-        map_names = [m for m in self.get_map_names(only_names=False, with_main_file=True, imported=True) if m[1]]
+        map_names = self.get_map_names(only_names=False, with_main_file=True, imported=True, non_null_only=True)
 
         if self.x_ll is not None and self.y_ll is not None and self.z_rotation is not None:
             for map_name, path_name, inter_name in map_names:
@@ -463,12 +543,14 @@ class FeatureProcess(MapFileManagerProtocol, metaclass=ABCMeta):
         _err, _errors = False, []
         fields = self.get_needed_field_names(alias=self.get_feature_type())
 
-        for field_key in [field for field in fields if fields[field]]:
-            field_name = fields[field_key]['name']
-            needed = fields[field_key]['needed']
+        field_keys = [field for field in fields if fields[field]]
+        columns = [fields[field_key]['name'] for field_key in field_keys]
+        needed_list = [fields[field_key]['needed'] for field_key in field_keys]
 
-            __err, __errors = GrassCoreAPI.check_basic_columns(map_name=map_name, columns=[field_name], needed=[needed])
+        # all the columns are checked with one read of the map columns
+        results = GrassCoreAPI.check_basic_columns_by_column(map_name=map_name, columns=columns, needed=needed_list)
 
+        for (field_name, __err, __errors), needed in zip(results, needed_list):
             self.summary.set_process_line(msg_name='check_basic_columns', check_error=__err,
                                           map_name=map_name, columns=field_name)
             if needed:
@@ -1,11 +1,83 @@
-from grass.pygrass.vector.geometry import Point
+import sys
+from collections import defaultdict
+from functools import cached_property, partial
+from operator import itemgetter
+
+import numpy as np
 
 from utils.Utils import GrassCoreAPI, TimerSummary, UtilMisc
+from processors.Models import ArcStore, NodeStore, RiverBreakNode
 from utils.Config import ConfigApp
 from utils.Errors import ErrorManager
+from utils.Geometry import points_on_polyline
+from utils.PointIndex import PointIndex
 from utils.Protocols import MapFileManagerProtocol
 from utils.SummaryInfo import SummaryInfo
 
+try:
+    from numba import njit
+except ModuleNotFoundError:
+    njit = None
+
+
+def classify_link_arcs(arc_type_ids, src_type_ids, dst_type_ids, rule_arc_types, rule_src_types, rule_dst_allowed):
+    """
+        Classifies link arcs (runoff/infiltration, transmission link, return flow) with the arc rules table in
+        array form (see GeoKernel._make_arc_rule_arrays). Returns two aligned arrays: the rule position of each arc
+        (-1 when the source node type is not allowed) and whether its destination node type is allowed by that rule.
+        Compiled with numba when the package is available, otherwise it uses numpy boolean masks.
+    """
+    rule_pos = np.full(arc_type_ids.shape[0], -1, dtype=np.int64)
+    for pos in range(rule_arc_types.shape[0]):
+        rule_pos[(arc_type_ids == rule_arc_types[pos]) & (src_type_ids == rule_src_types[pos])] = pos
+
+    known_dst = (rule_pos >= 0) & (dst_type_ids >= 0) & (dst_type_ids < rule_dst_allowed.shape[1])
+    dst_ok = np.zeros(arc_type_ids.shape[0], dtype=np.bool_)
+    dst_ok[known_dst] = rule_dst_allowed[rule_pos[known_dst], dst_type_ids[known_dst]]
+
+    return rule_pos, dst_ok
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _classify_link_arcs_jit(arc_type_ids, src_type_ids, dst_type_ids, rule_arc_types, rule_src_types,
+                                rule_dst_allowed):
+        n = arc_type_ids.shape[0]
+        rule_pos = np.full(n, -1, dtype=np.int64)
+        dst_ok = np.zeros(n, dtype=np.bool_)
+
+        for i in range(n):
+            for pos in range(rule_arc_types.shape[0]):
+                if arc_type_ids[i] == rule_arc_types[pos] and src_type_ids[i] == rule_src_types[pos]:
+                    rule_pos[i] = pos
+                    dst_type_id = dst_type_ids[i]
+                    if 0 <= dst_type_id < rule_dst_allowed.shape[1]:
+                        dst_ok[i] = rule_dst_allowed[pos, dst_type_id]
+                    break
+
+        return rule_pos, dst_ok
+
+    classify_link_arcs = _classify_link_arcs_jit
+
+# warning message templates (formatted only when the warnings are flushed, see GeoKernel._flush_warnings)
+MSG_TRIBUTARY_NAME = "[ADVERTENCIA] El nodo del tipo [Tributary Inflow] tiene un nombre={} levemente" \
+                     " diferente al rio que esta conectado, de nombre={}."
+# cases: catchment->[groundwater | catchment inflow node]
+MSG_RUNOFF_INFILTRATION = "Tipos permitidos para Runoff/Infiltration: catchment->[groundwater | catchment inflow node]. " \
+                          "Pero se encontro en el nodo [{}]: nombre={{}}, tipo={{}}."
+# cases: groundwater->[demand site | catchment] or demand site->[catchment | tributary inflow] or
+# river withdrawal->[demand site | catchment] or reservoir->[demand site | catchment]
+MSG_TRANSMISSION_LINK = "Tipos permitidos para [Transmission Link]: {}[groundwater]->[demand site] | [catchment] | " \
+                        "{}[demand site]->[catchment] | [tributary inflow] | {}[river withdrawal]->[demand site] | [catchment] | " \
+                        "[reservoir]->[demand site] | [catchment]" \
+                        "Pero se encontro en el nodo [{}]: [nombre={{}}], [tipo={{}}]."
+# cases: demand site->[groundwater | return flow node]
+MSG_RETURN_FLOW = "Tipos permitidos para Return Flow: demand site->[groundwater | return flow node]. " \
+                  "Pero se encontro en el nodo [{}]: nombre={{}}, tipo={{}}."
+MSG_RIVER_WITHOUT_NAME = "River or Canal (ObjID=[{}]) without name"
+MSG_ARC_TYPE = "Tipos de enlaces permitidos: Runoff/Infiltration | Return Flow | River | Transmission Link. " \
+               "Datos de geometria encontrada: nombre={}, tipo={}, id={}"
+
 
 class GeoKernel(MapFileManagerProtocol):
     """
@@ -20,8 +92,9 @@ class GeoKernel(MapFileManagerProtocol):
 
         Attributes:
         ----------
-        nodes : Dict[int<id>, Dict[str, str | int]]
-            Stores all nodes found in node vector map (surface scheme).
+        nodes : NodeStore
+            Stores all nodes found in node vector map (surface scheme), in columns indexed by node ID. It can still be
+            accessed like a dictionary ('nodes[node_id]["type_id"]'), see processors.Models.NodeStore.
             The following data is stored:
                 - 'type_id': geometry type ID.
                 - 'name': node name.
@@ -29,8 +102,9 @@ class GeoKernel(MapFileManagerProtocol):
                 - 'y': y-axis position of the node.
                 - 'cat': node internal ID (used by 'pygrass library').
 
-        arcs : Dict[str, Dict[str, int<id>]]
-            Stores all arcs found in arc vector map (surface scheme).
+        arcs : ArcStore
+            Stores all arcs found in arc vector map (surface scheme), in columns indexed by arc ID. It can still be
+            accessed like a dictionary ('arcs[arc_id]["src_id"]'), see processors.Models.ArcStore.
             The following data is stored:
                 - 'type_id': geometry type ID.
                 - 'src_id': source node ID (or None)
@@ -78,8 +152,15 @@ class GeoKernel(MapFileManagerProtocol):
                 - 'x': x-axis position of the node.
                 - 'y': y-axis position of the node.
 
-        river_break_nodes : Dict[int, Dict[str, str | int | bool]]
-            Stores nodes that modify the flow river. Indexed by node ID.
+        _break_node_list, _break_node_xs, _break_node_ys : List[Dict], np.ndarray, np.ndarray
+            Structure of arrays with the named 'river_break_nodes' (same dict objects) and their coordinates,
+            aligned by position. Built after reading the node map.
+
+        _break_node_index : PointIndex
+            Spatial index over break nodes coordinates, indexed by position in '_break_node_list'.
+
+        river_break_nodes : Dict[int, RiverBreakNode]
+            Stores nodes that modify the flow river. Indexed by node ID. (see processors.Models.RiverBreakNode)
             The following data is stored:
             - 'node_id': node ID.
             - 'node_name': node name.
@@ -108,9 +189,9 @@ class GeoKernel(MapFileManagerProtocol):
         node_map_names : Dict[str, Dict[str, str]]
             Stores link between node vector map name(s) and its shapefile path. It is indexed by map name.
 
-        _feature_type : str
-            Text used to identify feature type to process.
-            (source: self.config.type_names[self.__class__.__name__]).
+        feature_type : str
+            Text used to identify feature type to process, computed once on first access (cached property).
+            (source: self.config.type_names[self.__class__.__name__]). 'get_feature_type()' returns the same value.
 
         summary : SummaryInfo
             Used to access the execution results (errors, warnings, input parameters, statistics.) generated
@@ -140,12 +221,45 @@ class GeoKernel(MapFileManagerProtocol):
         get_river_break_nodes(self)
             Gets nodes that modify the river flow and that were found on surface node map.
 
-        _get_break_node_distance_from_arc(self, river_arc)
+        _flush_warnings(self)
+            Formats the pending warnings ('_pending_warns': arc map position, message template and its arguments) and
+            stores them in the error manager, in arc map order. Warnings found while reading the arcs are only
+            formatted here.
+
+        _make_arc_rules(self)
+            Builds the arc rules table used by 'processing_nodes_arcs', indexed by (arc type, source node type).
+            Each rule stores the link type ('ri', 'tl' or 'rf'), the allowed destination node types and the warning
+            message. It also returns the warning messages for source node types that are not allowed.
+
+        _make_arc_rule_arrays(self)
+            Builds the arc rules table in array form for 'classify_link_arcs': rule keys, arc type and source node
+            type of each rule, and a boolean matrix [rule position, node type ID] with the allowed destination types.
+
+        _make_break_node_index(self)
+            Builds the coordinate arrays, the extent and the spatial index ('PointIndex') of the nodes that modify
+            the river flow.
+
+        _assign_break_nodes_to_arcs(self, river_arcs, min_rate, tol)
+            Calculates the distances between all the river arcs ('river_arcs': list of (map position, line, name,
+            arc ID)) and the nodes that modify the river flow, once all the arcs were read. For each arc, only the nodes inside
+            its bounding box (expanded by 'tol') are tested, using the break nodes spatial index. Arcs whose bounding
+            box is outside the break nodes extent are skipped without querying the index.
+
+        _get_break_node_distance_from_arc(self, river_arc, arc_name, arc_id, arc_pos, positions, tributary_type_id, min_rate, tol)
             Calculates distance between a river arc and nodes that modify the river flow. The 'river_arc' parameter
-            represents the river arc over which the distance is calculated.
+            represents the river arc over which the distance is calculated, 'arc_pos' its position in the arc map
+            (used to order its warnings) and 'positions' the candidate nodes (positions in the break nodes index).
 
-        _check_point_on_line(line, pt)
-            Check if a point is on a line. If yes, returns the distance from the point to the line start.
+        _check_points_on_line(line_xs, line_ys, xs, ys, tol)
+            Check which points are on a line (given by its vertices coordinates), all at once. A point is on the line
+            when its closest point on the line is within 'tol' ('config.break_node_tolerance', by default 0.0: the
+            closest point must be the point itself). Returns a boolean mask and the distances from the points to the
+            line start. (see utils.Geometry.points_on_polyline)
+
+        _set_groundwater_node, _set_catchment_node, _set_demand_site_node, _set_return_flow_node,
+        _set_river_break_node, _set_other_node (self, point_id, point_type_id, point_name, point_x, point_y, point_cat)
+            Node handlers used by 'processing_nodes_arcs', dispatched by node type ID. Each one stores the node in
+            its structure and returns the default name for the node type (used when the node has no name).
 
         summary : SummaryInfo
             Used to access the execution results (errors, warnings, input parameters, statistics.) generated by
@@ -201,8 +315,8 @@ class GeoKernel(MapFileManagerProtocol):
 
         self._err = err
 
-        self.nodes = {}
-        self.arcs = {}
+        self.nodes = NodeStore()
+        self.arcs = ArcStore()
         self.links = {
             'tl': {},  # transmission link
             'ri': {},  # runoff infiltration
@@ -214,12 +328,27 @@ class GeoKernel(MapFileManagerProtocol):
         self.demand_sites = {}
         self.other_nodes = {}
         self.river_break_nodes = {}
+        self._break_node_list = []
+        self._break_node_xs = np.empty(0, dtype=np.float64)
+        self._break_node_ys = np.empty(0, dtype=np.float64)
+        self._break_node_index = PointIndex()
+        self._break_node_extent = None
         self.rivers = {}
 
         self.arc_map_names = {}
         self.node_map_names = {}
 
-        self._feature_type = self.config.type_names[self.__class__.__name__]
+        self._arc_rules, self._arc_src_errors = self._make_arc_rules()
+        self._arc_rule_arrays = self._make_arc_rule_arrays()
+        self._pending_warns = []
+
+        node_type = self.config.nodes_type_id
+        self._break_node_type_names = {
+            node_type["tributary_inflow"]: 'tributary inflow',
+            node_type["catchment_inflow_node"]: 'catchment inflow node',
+            node_type["river_withdrawal"]: 'river withdrawal',
+            node_type["diversion_outflow"]: 'diversion outflow'
+        }
 
         self.summary = SummaryInfo(prefix=self.get_feature_type(), errors=self._err, config=self.config)
 
@@ -235,8 +364,12 @@ class GeoKernel(MapFileManagerProtocol):
     def get_summary(self):
         return self.summary
 
+    @cached_property
+    def feature_type(self):
+        return self.config.type_names[self.__class__.__name__]
+
     def get_feature_type(self):
-        return self._feature_type
+        return self.feature_type
 
     def get_catchments(self):
         return self.catchments
@@ -254,45 +387,197 @@ class GeoKernel(MapFileManagerProtocol):
         return self.river_break_nodes
 
     @staticmethod
-    def _check_point_on_line(line, pt):
-        closest_pont_on_line, dst_bt_two_pts, dst_from_segment_beginning, dst_from_line_beg = line.distance(pt)
-
-        return closest_pont_on_line == pt, dst_from_line_beg
-
-    def _get_break_node_distance_from_arc(self, river_arc, min_rate=0.9):
-        for break_node_id in self.river_break_nodes:
-
-            if break_node_id != '_by_name':  # TODO: FIX IT - remove '_by_name'
-                break_node = self.river_break_nodes[break_node_id]
-
-                if break_node['node_name']:
-                    point_node = Point(break_node['x'], break_node['y'])
-                    arc_name = river_arc.attrs['Name']
-                    arc_id = river_arc.attrs['ObjID']
-
-                    pt_on_line, dist = GeoKernel._check_point_on_line(river_arc, point_node)
-
-                    if pt_on_line:
-                        if break_node['node_type'] == 13:  # Tributary Node
-                            if break_node['node_name'] == arc_name + ' Inflow':  # it is the seconday river
-                                break_node['secondary_river_id'] = arc_id
-                                break_node['secondary_distance'] = dist
-                            elif UtilMisc.get_similarity_rate(break_node['node_name'], arc_name + ' Inflow', min_rate=min_rate):  # it is the seconday river
-                                msg_error = "[ADVERTENCIA] El nodo del tipo [Tributary Inflow] tiene un nombre={} levemente" \
-                                            " diferente al rio que esta conectado, de nombre={}.".format(break_node['node_name'], arc_name)
-
-                                self.append_error(msg=msg_error, typ=self.get_feature_type(), is_warn=True)
-
-                                break_node['secondary_river_id'] = arc_id
-                                break_node['secondary_distance'] = dist
-                            else:  # it is the main river
-                                break_node['main_river_id'] = arc_id
-                                break_node['main_distance'] = dist  # use main distance like node distance
-                                break_node['distance'] = dist
-                        else:
-                            break_node['main_river_id'] = arc_id
-                            break_node['main_distance'] = dist  # use main distance like node distance
-                            break_node['distance'] = dist
+    def _check_points_on_line(line_xs, line_ys, xs, ys, tol=0.0):
+        return points_on_polyline(line_xs, line_ys, xs, ys, tol)
+
+    def _make_break_node_index(self):
+        break_nodes = [break_node for break_node in self.river_break_nodes.values() if break_node.node_name]
+
+        # columnar copy of the break node fields read for every river arc (the dicts are still updated)
+        self._break_node_list = break_nodes
+        self._break_node_xs = np.fromiter((break_node.x for break_node in break_nodes), dtype=np.float64, count=len(break_nodes))
+        self._break_node_ys = np.fromiter((break_node.y for break_node in break_nodes), dtype=np.float64, count=len(break_nodes))
+
+        self._break_node_index = PointIndex((pos, x, y) for pos, (x, y) in
+                                            enumerate(zip(self._break_node_xs.tolist(), self._break_node_ys.tolist())))
+
+        # extent of all break nodes (west, south, east, north), to reject arcs away from every break node
+        if break_nodes:
+            self._break_node_extent = (float(self._break_node_xs.min()), float(self._break_node_ys.min()),
+                                       float(self._break_node_xs.max()), float(self._break_node_ys.max()))
+        else:
+            self._break_node_extent = None
+
+    def _assign_break_nodes_to_arcs(self, river_arcs, min_rate=0.9, tol=0.0):
+        if not len(self._break_node_index):
+            return
+
+        query = self._break_node_index.query
+        tributary_type_id = self.config.nodes_type_id["tributary_inflow"]
+        nodes_west, nodes_south, nodes_east, nodes_north = self._break_node_extent
+
+        for arc_pos, river_arc, arc_name, arc_id in river_arcs:
+            # only break nodes inside the arc bounding box can be on the arc
+            bbox = river_arc.bbox()
+            west, south, east, north = bbox.west - tol, bbox.south - tol, bbox.east + tol, bbox.north + tol
+
+            # constant time rejection: the arc box does not touch the box of all break nodes
+            if east < nodes_west or west > nodes_east or north < nodes_south or south > nodes_north:
+                continue
+
+            positions = query(west, south, east, north)
+
+            if positions:
+                self._get_break_node_distance_from_arc(river_arc, arc_name, arc_id, arc_pos, positions,
+                                                       tributary_type_id, min_rate=min_rate, tol=tol)
+
+    def _get_break_node_distance_from_arc(self, river_arc, arc_name, arc_id, arc_pos, positions, tributary_type_id,
+                                          min_rate=0.9, tol=0.0):
+        inflow_name = arc_name + ' Inflow'
+
+        break_nodes = [self._break_node_list[pos] for pos in positions]
+
+        # arc vertices are read once, the point-on-line test runs over them
+        coords = river_arc.to_array()
+        line_xs = np.ascontiguousarray(coords[:, 0], dtype=np.float64)
+        line_ys = np.ascontiguousarray(coords[:, 1], dtype=np.float64)
+
+        # break node coordinates are built once (see _make_break_node_index), here they are only gathered
+        positions_arr = np.asarray(positions, dtype=np.intp)
+        pts_on_line, dists = GeoKernel._check_points_on_line(line_xs, line_ys, self._break_node_xs[positions_arr],
+                                                             self._break_node_ys[positions_arr], tol)
+
+        for break_node, pt_on_line, dist in zip(break_nodes, pts_on_line.tolist(), dists.tolist()):
+            if pt_on_line:
+                if break_node.node_type == tributary_type_id:  # Tributary Node
+                    if break_node.node_name == inflow_name:  # it is the seconday river
+                        break_node.secondary_river_id = arc_id
+                        break_node.secondary_distance = dist
+                    elif UtilMisc.get_similarity_rate(break_node.node_name, inflow_name, min_rate=min_rate):  # it is the seconday river
+                        self._pending_warns.append((arc_pos, MSG_TRIBUTARY_NAME, (break_node.node_name, arc_name)))
+
+                        break_node.secondary_river_id = arc_id
+                        break_node.secondary_distance = dist
+                    else:  # it is the main river
+                        break_node.main_river_id = arc_id
+                        break_node.main_distance = dist  # use main distance like node distance
+                        break_node.distance = dist
+                else:
+                    break_node.main_river_id = arc_id
+                    break_node.main_distance = dist  # use main distance like node distance
+                    break_node.distance = dist
+
+    def _flush_warnings(self):
+        # stable sort by arc position: the messages of each arc keep the order in which they were found
+        self._pending_warns.sort(key=itemgetter(0))
+        self.append_warn_msgs([template.format(*args) for _, template, args in self._pending_warns], self.feature_type)
+        self._pending_warns.clear()
+
+    def _make_arc_rules(self):
+        node_type = self.config.nodes_type_id
+        arc_type = self.config.arc_type_id
+
+        msg_ri, msg_tl, msg_rf = MSG_RUNOFF_INFILTRATION, MSG_TRANSMISSION_LINK, MSG_RETURN_FLOW
+
+        ds_or_catchment = (node_type["demand_site"], node_type["catchment"])
+
+        arc_rules = {
+            (arc_type["runoff_infiltration"], node_type["catchment"]):
+                ('ri', (node_type["groundwater"], node_type["catchment_inflow_node"]), msg_ri.format('fin')),
+            (arc_type["transmission_link"], node_type["groundwater"]):
+                ('tl', ds_or_catchment, msg_tl.format('(*)', '', '', 'fin')),
+            (arc_type["transmission_link"], node_type["demand_site"]):
+                ('tl', (node_type["catchment"], node_type["river_withdrawal"], node_type["tributary_inflow"]),
+                 msg_tl.format('', '(*)', '', 'fin')),
+            (arc_type["transmission_link"], node_type["river_withdrawal"]):
+                ('tl', ds_or_catchment, msg_tl.format('', '', '(*)', 'fin')),
+            (arc_type["transmission_link"], node_type["reservoir"]):
+                ('tl', ds_or_catchment, msg_tl.format('', '', '', 'fin')),
+            (arc_type["return_flow"], node_type["demand_site"]):
+                ('rf', (node_type["groundwater"], node_type["return_flow_node"]), msg_rf.format('fin')),
+        }
+
+        # error message when the source node type is not allowed for the arc type
+        arc_src_errors = {
+            arc_type["runoff_infiltration"]: msg_ri.format('inicio'),
+            arc_type["transmission_link"]: msg_tl.format('', '', '', 'inicio'),
+            arc_type["return_flow"]: msg_rf.format('inicio'),
+        }
+
+        return arc_rules, arc_src_errors
+
+    def _make_arc_rule_arrays(self):
+        rule_keys = list(self._arc_rules)
+        rule_arc_types = np.array([arc_type_id for arc_type_id, _ in rule_keys], dtype=np.int32)
+        rule_src_types = np.array([src_type_id for _, src_type_id in rule_keys], dtype=np.int32)
+
+        # rule_dst_allowed[rule position, node type ID] => destination node type allowed
+        max_node_type_id = max(self.config.nodes_type_id.values())
+        rule_dst_allowed = np.zeros((len(rule_keys), max_node_type_id + 1), dtype=np.bool_)
+        for pos, rule_key in enumerate(rule_keys):
+            rule_dst_allowed[pos, list(self._arc_rules[rule_key][1])] = True
+
+        return rule_keys, rule_arc_types, rule_src_types, rule_dst_allowed
+
+    def _set_groundwater_node(self, point_id, point_type_id, point_name, point_x, point_y, point_cat):
+        self.gws[point_id] = {
+            'name': point_name
+        }
+
+        return 'groundwater'
+
+    def _set_catchment_node(self, point_id, point_type_id, point_name, point_x, point_y, point_cat):
+        self.catchments[point_id] = {
+            'name': point_name
+        }
+
+        return 'catchment'
+
+    def _set_demand_site_node(self, point_id, point_type_id, point_name, point_x, point_y, point_cat):
+        self.demand_sites[point_id] = {
+            'name': point_name,
+            'x': point_x,
+            'y': point_y,
+            'cat': point_cat,
+            'processed': False,
+            'is_well': False  # it is preliminarily assumed to be a well
+        }
+
+        return 'demand site'
+
+    def _set_return_flow_node(self, point_id, point_type_id, point_name, point_x, point_y, point_cat):
+        _point_name = 'return flow node'
+
+        self.other_nodes[point_id] = {
+            'name': point_name or _point_name,
+            'type': point_name,
+            'x': point_x,
+            'y': point_y
+        }
+
+        return _point_name
+
+    def _set_river_break_node(self, point_id, point_type_id, point_name, point_x, point_y, point_cat):
+        _point_name = self._break_node_type_names[point_type_id]
+
+        if point_name:
+            self.river_break_nodes[point_id] = RiverBreakNode(node_id=point_id, node_name=point_name, node_type=point_type_id,
+                                                              node_type_name=_point_name, x=point_x, y=point_y)
+        # else: "[{}] inflow node node (ObjID=[{}]) without name. It will be ignorated."
+
+        return _point_name
+
+    def _set_other_node(self, point_id, point_type_id, point_name, point_x, point_y, point_cat):
+        _point_name = 'other'
+
+        self.other_nodes[point_id] = {
+            'name': point_name or _point_name,
+            'type': point_type_id,
+            'x': point_x,
+            'y': point_y
+        }
+
+        return _point_name
 
     @TimerSummary.timeit
     # @main_task
@@ -307,392 +592,212 @@ class GeoKernel(MapFileManagerProtocol):
         node_type = self.config.nodes_type_id
         arc_type = self.config.arc_type_id
 
-        for p in nodemap.viter('points'):
-            point_name = p.attrs[node_column['name']]
-            point_type_id = p.attrs[node_column['type_id']]  # 3: GW; 21: Catchment; 13: Inflow
-            point_id = p.attrs[node_column['obj_id']]
+        # read all node attributes at once, instead of one query per attribute and point
+        node_attrs = GrassCoreAPI.get_attributes_by_cat(vector_map=nodemap, key_column=node_column['cat'],
+                                                        columns=[node_column['name'], node_column['type_id'], node_column['obj_id']])
+
+        # dispatch node handlers by type ID (other types are stored as 'other' nodes)
+        node_handlers = {
+            node_type["groundwater"]: self._set_groundwater_node,
+            node_type["catchment"]: self._set_catchment_node,
+            node_type["demand_site"]: self._set_demand_site_node,
+            node_type["return_flow_node"]: self._set_return_flow_node,
+            node_type["tributary_inflow"]: self._set_river_break_node,
+            node_type["catchment_inflow_node"]: self._set_river_break_node,
+            node_type["river_withdrawal"]: self._set_river_break_node,
+            node_type["diversion_outflow"]: self._set_river_break_node,
+        }
+        set_other_node = self._set_other_node
 
-            point_x, point_y = p.x, p.y
-            point_cat = p.attrs[node_column['cat']]
+        # node columns, preallocated with the number of attribute rows (rows without a point are trimmed later)
+        n_rows = len(node_attrs)
+        node_ids, node_type_ids, node_names = [None] * n_rows, [None] * n_rows, [None] * n_rows
+        node_xs, node_ys, node_cats = [None] * n_rows, [None] * n_rows, [None] * n_rows
+        n_points = 0
 
-            self.nodes[point_id] = {
-                'type_id': point_type_id,
-                'name': point_name,
-                'x': point_x,
-                'y': point_y,
-                'cat': point_cat
-            }
+        for p in nodemap.viter('points'):
+            point_cat = p.cat
+            point_name, point_type_id, point_id = node_attrs[point_cat]  # type_id => 3: GW; 21: Catchment; 13: Inflow
 
-            if point_type_id == node_type["groundwater"]:  # gw
-                _point_name = 'groundwater'
+            point_x, point_y = p.x, p.y
 
-                self.gws[point_id] = {
-                    'name': point_name
+            _point_name = node_handlers.get(point_type_id, set_other_node)(point_id, point_type_id, point_name,
+                                                                            point_x, point_y, point_cat)
+
+            node_ids[n_points], node_type_ids[n_points] = point_id, point_type_id
+            # check if 'name' is null. Names are interned once here, the checks use them as dict keys
+            node_name = point_name or _point_name
+            node_names[n_points] = sys.intern(node_name) if isinstance(node_name, str) else node_name
+            node_xs[n_points], node_ys[n_points], node_cats[n_points] = point_x, point_y, point_cat
+            n_points += 1
+
+        self.nodes = nodes = NodeStore(ids=node_ids[:n_points], type_id=node_type_ids[:n_points],
+                                       name=node_names[:n_points], x=node_xs[:n_points], y=node_ys[:n_points],
+                                       cat=node_cats[:n_points])
+
+        self._make_break_node_index()
+
+        # (arc type, source node type) => (link, allowed destination node types, error message)
+        arc_rules, arc_src_errors = self._arc_rules, self._arc_src_errors
+        link_arc_types = set(arc_src_errors)
+        river_arc_types = {arc_type["river"], arc_type["canal"]}
+        pending_warns = self._pending_warns
+        rivers = self.rivers
+        river_arcs = []
+
+        # arcs are collected as (map position, key, value) and links as (key, value) pairs, both stored at the end
+        arc_pairs = []
+        link_pairs = {link_key: [] for link_key in self.links}
+
+        # bound 'append' methods, resolved once instead of on every arc
+        add_arc, add_river_arc, add_warn = arc_pairs.append, river_arcs.append, pending_warns.append
+        add_link = {link_key: pairs.append for link_key, pairs in link_pairs.items()}
+
+        # read all arc attributes at once, instead of one query per attribute and line
+        arc_attrs = GrassCoreAPI.get_attributes_by_cat(vector_map=arcmap, key_column=arc_column['cat'],
+                                                       columns=[arc_column["name"], arc_column["type_id"], arc_column["obj_id"],
+                                                                arc_column["src_obj_id"], arc_column["dest_obj_id"]])
+
+        # first pass: arcs are grouped by kind ('link', 'river' or 'other'), keeping the map order in each group.
+        # Each arc keeps its map position, so arcs and warnings are stored in map order (see _flush_warnings)
+        arc_kinds = {**dict.fromkeys(link_arc_types, 'link'), **dict.fromkeys(river_arc_types, 'river')}
+        arcs_by_kind = defaultdict(list)
+
+        for line_pos, l in enumerate(arcmap.viter('lines')):
+            line_cat = l.cat
+            # type_id => 22: Runoff/Infiltration; 6: River; 7: transmission link; 6,15: River or Canal; 8: return flow
+            line_attrs = arc_attrs[line_cat]  # (name, type_id, obj_id, src_obj_id, dest_obj_id)
+            arcs_by_kind[arc_kinds.get(line_attrs[1], 'other')].append((line_pos, l, line_cat) + line_attrs)
+
+        # Runoff/Infiltration, Transmission Link or Return Flow: classified over the type columns
+        link_arcs = arcs_by_kind['link']
+        n_links = len(link_arcs)
+        link_positions = [line_pos for line_pos, *_ in link_arcs]
+        link_ids = [line_id for _, _, _, _, _, line_id, _, _ in link_arcs]
+        link_type_ids = np.fromiter((line_type_id for _, _, _, _, line_type_id, _, _, _ in link_arcs), dtype=np.int32, count=n_links)
+        link_src_ids = np.fromiter((-1 if src_id is None else src_id for *_, src_id, _ in link_arcs), dtype=np.int64, count=n_links)
+        link_dst_ids = np.fromiter((-1 if dst_id is None else dst_id for *_, dst_id in link_arcs), dtype=np.int64, count=n_links)
+
+        rule_keys, rule_arc_types, rule_src_types, rule_dst_allowed = self._arc_rule_arrays
+        rule_pos, dst_ok = classify_link_arcs(link_type_ids, nodes.get_type_ids(link_src_ids),
+                                              nodes.get_type_ids(link_dst_ids), rule_arc_types, rule_src_types,
+                                              rule_dst_allowed)
+
+        # arcs with an allowed source node are stored
+        for i in np.flatnonzero(rule_pos >= 0).tolist():
+            add_arc((link_positions[i], link_ids[i], {
+                'type_id': int(link_type_ids[i]),
+                'src_id': link_arcs[i][6],
+                'dst_id': link_arcs[i][7]
+            }))
+
+        # links with allowed source and destination nodes, by link type
+        link_src_list, link_dst_list, rule_pos_list = link_src_ids.tolist(), link_dst_ids.tolist(), rule_pos.tolist()
+        for i in np.flatnonzero(dst_ok).tolist():
+            add_link[arc_rules[rule_keys[rule_pos_list[i]]][0]]((link_src_list[i], link_dst_list[i]))
+
+        # warnings only for the arcs not allowed (source or destination node type), in map order
+        for i in np.flatnonzero(~dst_ok).tolist():
+            if rule_pos_list[i] >= 0:
+                node_dst = nodes[link_dst_list[i]]
+                add_warn((link_positions[i], arc_rules[rule_keys[rule_pos_list[i]]][2],
+                          (node_dst['name'], node_dst['type_id'])))
+            else:
+                node_src = nodes[link_src_list[i]]
+                add_warn((link_positions[i], arc_src_errors[int(link_type_ids[i])],
+                          (node_src['name'], node_src['type_id'])))
+
+        # River or Canal
+        for line_pos, l, line_cat, line_name, line_type_id, line_id, node_src_id, node_dst_id in arcs_by_kind['river']:
+            if line_name:
+                rivers[line_id] = {
+                    'name': line_name,
+                    'id': line_id,
+                    'cat': line_cat,
+                    'type': line_type_id
                 }
 
-            elif point_type_id == node_type["catchment"]:  # catchment
-                _point_name = 'catchment'
+                add_arc((line_pos, line_id, {
+                    'type_id': line_type_id,
+                    'src_id': None,
+                    'dst_id': None
+                }))
 
-                self.catchments[point_id] = {
-                    'name': point_name
-                }
-                # self.catchments[point_name] = point_id
-
-            elif point_type_id == node_type["demand_site"]:  # demand site
-                _point_name = 'demand site'
-
-                self.demand_sites[point_id] = {
-                    'name': point_name,
-                    'x': point_x,
-                    'y': point_y,
-                    'cat': point_cat,
-                    'processed': False,
-                    'is_well': False  # it is preliminarily assumed to be a well
-                }
+                add_river_arc((line_pos, l, line_name, line_id))
+            else:  # river without name
+                add_warn((line_pos, MSG_RIVER_WITHOUT_NAME, (line_id,)))
 
-            elif point_type_id == node_type["return_flow_node"]:  # return flow node
-                _point_name = 'return flow node'
+        # arc types not used
+        pending_warns.extend((line_pos, MSG_ARC_TYPE, (line_name, line_type_id, line_id))
+                             for line_pos, _, _, line_name, line_type_id, line_id, _, _ in arcs_by_kind['other'])
 
-                self.other_nodes[point_id] = {
-                    'name': point_name or _point_name,
-                    'type': point_name,
-                    'x': point_x,
-                    'y': point_y
-                }
+        arc_pairs.sort(key=itemgetter(0))  # back to map order
+        self.arcs = ArcStore(ids=[line_id for _, line_id, _ in arc_pairs],
+                             type_id=[arc['type_id'] for _, _, arc in arc_pairs],
+                             src_id=[arc['src_id'] for _, _, arc in arc_pairs],
+                             dst_id=[arc['dst_id'] for _, _, arc in arc_pairs])
+        for link_key, pairs in link_pairs.items():
+            self.links[link_key].update(pairs)
 
-            elif point_type_id == node_type["tributary_inflow"]:  # inflow
-                _point_name = 'tributary inflow'
-                _point_type = node_type["tributary_inflow"]
-
-                if point_name:
-                    self.river_break_nodes[point_id] = {
-                        'node_id': point_id,
-                        'node_name': point_name,
-                        'node_type': _point_type,
-                        'node_type_name': _point_name,
-                        'x': point_x,
-                        'y': point_y,
-                        'distance': None,
-                        'main_river_id': None,  # it will set by arc, when it will calculate the distance
-                        'main_distance': None,
-                        'secondary_river_id': None,  # it will set by arc
-                        'secondary_distance': None,
-                    }
-                else:
-                    msg_error = "[{}] inflow node node (ObjID=[{}]) without name. It will be ignorated." \
-                        .format(_point_name.title(), point_id)
-                    # self._errors['ris'].append(msg_error)
-                    # self.append_error(msg=msg_error, typ=self.get_feature_type(), is_warn=True)
-
-            elif point_type_id == node_type["catchment_inflow_node"]:  # catchment inflow node
-                _point_name = 'catchment inflow node'
-                _point_type = node_type["catchment_inflow_node"]
-
-                if point_name:
-                    self.river_break_nodes[point_id] = {
-                        'node_id': point_id,
-                        'node_name': point_name,
-                        'node_type': _point_type,
-                        'node_type_name': _point_name,
-                        'x': point_x,
-                        'y': point_y,
-                        'distance': None,
-                        'main_river_id': None,  # it will set by arc, when it will calculate the distance
-                        'main_distance': None
-                    }
-                else:
-                    msg_error = "[{}] inflow node node (ObjID=[{}]) without name. It will be ignorated." \
-                        .format(_point_name.title(), point_id)
-                    # self._errors['ris'].append(msg_error)
-                    # self.append_error(msg=msg_error, typ=self.get_feature_type(), is_warn=True)
-
-            elif point_type_id == node_type["river_withdrawal"]:  # river withdrawal
-                _point_name = 'river withdrawal'
-                _point_type = node_type["river_withdrawal"]
-
-                if point_name:
-                    self.river_break_nodes[point_id] = {
-                        'node_id': point_id,
-                        'node_name': point_name,
-                        'node_type': _point_type,
-                        'node_type_name': _point_name,
-                        'x': point_x,
-                        'y': point_y,
-                        'distance': None,
-                        'main_river_id': None,  # it will set by arc, when it will calculate the distance
-                        'main_distance': None
-                    }
-                else:
-                    msg_error = "[{}] inflow node node (ObjID=[{}]) without name. It will be ignorated."\
-                        .format(_point_name.title(), point_id)
-                    # self._errors['ris'].append(msg_error)
-                    # self.append_error(msg=msg_error, typ=self.get_feature_type(), is_warn=True)
-
-            elif point_type_id == node_type["diversion_outflow"]:  # diversion outflow
-                _point_name = 'diversion outflow'
-                _point_type = node_type["diversion_outflow"]
-
-                if point_name:
-                    self.river_break_nodes[point_id] = {
-                        'node_id': point_id,
-                        'node_name': point_name,
-                        'node_type': _point_type,
-                        'node_type_name': _point_name,
-                        'x': point_x,
-                        'y': point_y,
-                        'distance': None,
-                        'main_river_id': None,  # it will set by arc, when it will calculate the distance
-                        'main_distance': None
-                    }
-                else:
-                    msg_error = "[{}] inflow node node (ObjID=[{}]) without name. It will be ignorated."\
-                        .format(_point_name.title(), point_id)
-                    # self._errors['ris'].append(msg_error)
-                    # self.append_error(msg=msg_error, typ=self.get_feature_type(), is_warn=True)
+        # complete distances in river break nodes (only break nodes in each river arc bounding box are tested)
+        self._assign_break_nodes_to_arcs(river_arcs, tol=self.config.break_node_tolerance)
 
-            else:
-                _point_name = 'other'
+        self._flush_warnings()
 
-                self.other_nodes[point_id] = {
-                    'name': point_name or _point_name,
-                    'type': point_type_id,
-                    'x': point_x,
-                    'y': point_y
-                }
+        _err = self.check_errors(types=[self.feature_type])
 
-            # check if 'name' is null
-            if not point_name:
-                point_name = _point_name
-                self.nodes[point_id]['name'] = point_name
-
-        for l in arcmap.viter('lines'):
-            line_name = l.attrs[arc_column["name"]]
-            line_type_id = l.attrs[arc_column["type_id"]]  # 22: Runoff/Infiltration; 6: River; 7: transmission link; 6,15: River or Canal; 8: return flow
-            line_type_name = l.attrs[arc_column["type_name"]]
-            line_id = l.attrs[arc_column["obj_id"]]
-
-            line_cat = l.attrs[arc_column["cat"]]
-            node_src_id, node_dst_id = l.attrs[arc_column["src_obj_id"]], l.attrs[arc_column["dest_obj_id"]]
-
-            if line_type_id == arc_type["runoff_infiltration"]:  # Runoff/Infiltration
-                # cases: catchment->[groundwater | catchment inflow node]
-                node_src = self.nodes[node_src_id]
-                node_dst = self.nodes[node_dst_id]
-
-                if node_src['type_id'] == node_type["catchment"]:  # catchment
-                    self.arcs[line_id] = {
-                        'type_id': line_type_id,
-                        'src_id': node_src_id,
-                        'dst_id': node_dst_id
-                    }
-
-                    # groundwater | catchment inflow node
-                    if node_dst['type_id'] == node_type["groundwater"] or node_dst['type_id'] == node_type["catchment_inflow_node"]:
-                        self.links['ri'][node_src_id] = node_dst_id
-                    else:
-                        msg_error = "Tipos permitidos para Runoff/Infiltration: catchment->[groundwater | catchment inflow node]. " \
-                                    "Pero se encontro en el nodo [fin]: nombre={}, tipo={}.".format(node_dst['name'],
-                                                                                                    node_dst['type_id'])
-                        # self._errors['ris'].append(msg_error)
-                        self.append_error(msg=msg_error, typ=self.get_feature_type(), is_warn=True)
-                else:
-                    msg_error = "Tipos permitidos para Runoff/Infiltration: catchment->[groundwater | catchment inflow node]. " \
-                                "Pero se encontro en el nodo [inicio]: nombre={}, tipo={}.".format(node_src['name'],
-                                                                                                   node_src['type_id'])
-                    # self._errors['ris'].append(msg_error)
-                    self.append_error(msg=msg_error, typ=self.get_feature_type(), is_warn=True)
-
-            elif line_type_id == arc_type["transmission_link"]:  # transmission link
-                # cases: groundwater->[demand site | catchment] or demand site->[catchment | tributary inflow] or river withdrawal->demand site
-                node_src = self.nodes[node_src_id]
-                node_dst = self.nodes[node_dst_id]
-
-                if node_src['type_id'] == node_type["groundwater"]:  # groundwater
-                    self.arcs[line_id] = {
-                        'type_id': line_type_id,
-                        'src_id': node_src_id,
-                        'dst_id': node_dst_id
-                    }
-
-                    # demand site | catchment
-                    if node_dst['type_id'] == node_type["demand_site"] or node_dst['type_id'] == node_type["catchment"]:
-                        self.links['tl'][node_src_id] = node_dst_id
-                    else:
-                        msg_error = "Tipos permitidos para [Transmission Link]: (*)[groundwater]->[demand site] | [catchment] | " \
-                                    "[demand site]->[catchment] | [tributary inflow] | [river withdrawal]->[demand site] | [catchment] | " \
-                                    "[reservoir]->[demand site] | [catchment]" \
-                                    "Pero se encontro en el nodo [fin]: [nombre={}], [tipo={}].".format(
-                            node_dst['name'],
-                            node_dst['type_id'])
-                        # self._errors['tls'].append(msg_error)
-                        self.append_error(msg=msg_error, typ=self.get_feature_type(), is_warn=True)
-                elif node_src['type_id'] == node_type["demand_site"]:  # demand site
-                    self.arcs[line_id] = {
-                        'type_id': line_type_id,
-                        'src_id': node_src_id,
-                        'dst_id': node_dst_id
-                    }
-
-                    # catchment | river_withdrawal | tributary inflow
-                    if node_dst['type_id'] == node_type["catchment"] or \
-                            node_dst['type_id'] == node_type["river_withdrawal"] or \
-                            node_dst['type_id'] == node_type["tributary_inflow"]:
-                        self.links['tl'][node_src_id] = node_dst_id
-                    else:
-                        msg_error = "Tipos permitidos para [Transmission Link]: [groundwater]->[demand site] | [catchment] | " \
-                                    "(*)[demand site]->[catchment] | [tributary inflow] | [river withdrawal]->[demand site] | [catchment] | " \
-                                    "[reservoir]->[demand site] | [catchment]" \
-                                    "Pero se encontro en el nodo [fin]: [nombre={}], [tipo={}].".format(
-                            node_dst['name'],
-                            node_dst['type_id'])
-                        # self._errors['tls'].append(msg_error)
-                        self.append_error(msg=msg_error, typ=self.get_feature_type(), is_warn=True)
-                elif node_src['type_id'] == node_type["river_withdrawal"]:  # river withdrawal
-                    self.arcs[line_id] = {
-                        'type_id': line_type_id,
-                        'src_id': node_src_id,
-                        'dst_id': node_dst_id
-                    }
-
-                    # demand site or catchment
-                    if node_dst['type_id'] == node_type["demand_site"] or node_dst['type_id'] == node_type["catchment"]:
-                        self.links['tl'][node_src_id] = node_dst_id
-                    else:
-                        msg_error = msg_error = "Tipos permitidos para [Transmission Link]: [groundwater]->[demand site] | [catchment] | " \
-                                    "[demand site]->[catchment] | [tributary inflow] | (*)[river withdrawal]->[demand site] | [catchment] | " \
-                                    "[reservoir]->[demand site] | [catchment]" \
-                                    "Pero se encontro en el nodo [fin]: [nombre={}], [tipo={}].".format(node_dst['name'],
-                                                                                                    node_dst['type_id'])
-                        # self._errors['tls'].append(msg_error)
-                        self.append_error(msg=msg_error, typ=self.get_feature_type(), is_warn=True)
-                elif node_src['type_id'] == node_type["reservoir"]:  # reservoir
-                    self.arcs[line_id] = {
-                        'type_id': line_type_id,
-                        'src_id': node_src_id,
-                        'dst_id': node_dst_id
-                    }
-
-                    # demand site or catchment
-                    if node_dst['type_id'] == node_type["demand_site"] or node_dst['type_id'] == node_type["catchment"]:
-                        self.links['tl'][node_src_id] = node_dst_id
-                    else:
-                        msg_error = "Tipos permitidos para [Transmission Link]: [groundwater]->[demand site] | [catchment] | " \
-                                    "[demand site]->[catchment] | [tributary inflow] | [river withdrawal]->[demand site] | [catchment] | " \
-                                    "[reservoir]->[demand site] | [catchment]" \
-                                    "Pero se encontro en el nodo [fin]: [nombre={}], [tipo={}].".format(node_dst['name'],
-                                                                                                    node_dst['type_id'])
-                        # self._errors['tls'].append(msg_error)
-                        self.append_error(msg=msg_error, typ=self.get_feature_type(), is_warn=True)
-                else:
-                    msg_error = "Tipos permitidos para [Transmission Link]: [groundwater]->[demand site] | [catchment] | " \
-                                    "[demand site]->[catchment] | [tributary inflow] | [river withdrawal]->[demand site] | [catchment] | " \
-                                    "[reservoir]->[demand site] | [catchment]" \
-                                "Pero se encontro en el nodo [inicio]: [nombre={}], [tipo={}].".format(node_src['name'],
-                                                                                                   node_src['type_id'])
-                    # self._errors['tls'].append(msg_error)
-                    self.append_error(msg=msg_error, typ=self.get_feature_type(), is_warn=True)
-
-            elif line_type_id == arc_type["river"] or line_type_id == arc_type["canal"]:  # River or Canal
-                if line_name:
-                    self.rivers[line_id] = {
-                        'name': line_name,
-                        'id': line_id,
-                        'cat': line_cat,
-                        'type': line_type_id
-                    }
-                    # self.rivers[line_name] = line_id
-
-                    self.arcs[line_id] = {
-                        'type_id': line_type_id,
-                        'src_id': None,
-                        'dst_id': None
-                    }
-
-                    # complete distances in river break nodes (order <= [river arcs number]*[brak nodes number])
-                    self._get_break_node_distance_from_arc(l)
-                else:  # river without name
-                    msg_error = "River or Canal (ObjID=[{}]) without name".format(line_id)
-                    self.append_error(msg=msg_error, typ=self.get_feature_type(), is_warn=True)
-
-            elif line_type_id == arc_type["return_flow"]:  # return flow
-                # cases: demand site->[groundwater | return flow node]
-                node_src = self.nodes[node_src_id]
-                node_dst = self.nodes[node_dst_id]
-
-                if node_src['type_id'] == node_type["demand_site"]:  # demand site
-                    self.arcs[line_id] = {
-                        'type_id': line_type_id,
-                        'src_id': node_src_id,
-                        'dst_id': node_dst_id
-                    }
-
-                    # groundwater | return flow node
-                    if node_dst['type_id'] == node_type["groundwater"] or node_dst['type_id'] == node_type["return_flow_node"]:
-                        self.links['rf'][node_src_id] = node_dst_id
-                        # catchment_to_gw[node_src_id] = node_dst_id
-                    else:
-                        msg_error = "Tipos permitidos para Return Flow: demand site->[groundwater | return flow node]. " \
-                                    "Pero se encontro en el nodo [fin]: nombre={}, tipo={}.".format(node_dst['name'],
-                                                                                                    node_dst['type_id'])
-                        # self._errors['rfs'].append(msg_error)
-                        self.append_error(msg=msg_error, typ=self.get_feature_type(), is_warn=True)
-                else:
-                    msg_error = "Tipos permitidos para Return Flow: demand site->[groundwater | return flow node]. " \
-                                "Pero se encontro en el nodo [inicio]: nombre={}, tipo={}.".format(node_src['name'],
-                                                                                                   node_src['type_id'])
-                    # self._errors['rfs'].append(msg_error)
-                    self.append_error(msg=msg_error, typ=self.get_feature_type(), is_warn=True)
-            else:
-                msg_error = "Tipos de enlaces permitidos: Runoff/Infiltration | Return Flow | River | Transmission Link. " \
-                            "Datos de geometria encontrada: nombre={}, tipo={}, id={}".format(line_name, line_type_id,
-                                                                                              line_id)
-                # self._errors['others'].append(msg_error)
-                self.append_error(msg=msg_error, typ=self.get_feature_type(), is_warn=True)
-
-        self.summary.set_process_line(msg_name='processing_nodes_arcs', check_error=self.check_errors(types=[self.get_feature_type()]),
-                                      arcmap=arcmap, nodemap=nodemap)
+        self.summary.set_process_line(msg_name='processing_nodes_arcs', check_error=_err, arcmap=arcmap, nodemap=nodemap)
 
-        return self.check_errors(types=[self.get_feature_type()]), self.get_errors()
+        return _err, self.get_errors()
 
     def check_basic_columns(self, map_name: str):
         _err, _errors = False, []
         code_error = ConfigApp.error_codes['geo_basic_column']  # code error for geo basic column
+        feature_type = self.feature_type
 
         if self.is_arc_map(map_name=map_name):
-            fields = self.get_needed_field_names(alias=self.get_feature_type(), is_arc=True)
+            fields = self.get_needed_field_names(alias=feature_type, is_arc=True)
         else:
-            fields = self.get_needed_field_names(alias=self.get_feature_type(), is_node=True)
+            fields = self.get_needed_field_names(alias=feature_type, is_node=True)
 
-        for field_key in [field for field in fields if fields[field]]:
-            field_name = fields[field_key]['name']
-            needed = fields[field_key]['needed']
+        _append_error = partial(self.append_err_msgs, typ=feature_type, code=code_error)
+        _append_warn = partial(self.append_warn_msgs, typ=feature_type, code=code_error)
 
-            __err, __errors = GrassCoreAPI.check_basic_columns(map_name=map_name, columns=[field_name], needed=[needed])
+        field_keys = [field for field in fields if fields[field]]
+        columns = [fields[field_key]['name'] for field_key in field_keys]
+        needed_list = [fields[field_key]['needed'] for field_key in field_keys]
 
+        # all the columns are checked with one read of the map columns
+        results = GrassCoreAPI.check_basic_columns_by_column(map_name=map_name, columns=columns, needed=needed_list)
+
+        for (field_name, __err, __errors), needed in zip(results, needed_list):
             self.summary.set_process_line(msg_name='check_basic_columns', check_error=__err,
                                           map_name=map_name, columns=field_name)
             if needed:
-                self.append_error(msgs=__errors, is_warn=False, typ=self.get_feature_type(), code=code_error)
+                _append_error(__errors)
             else:
-                self.append_error(msgs=__errors, is_warn=True, typ=self.get_feature_type(), code=code_error)
+                _append_warn(__errors)
 
         return self.check_errors(code=code_error), self.get_errors(code=code_error)
 
     def import_maps(self, verbose: bool = False, quiet: bool = True):
-        map_names = [m for m in self.get_map_names(only_names=False, with_main_file=True, imported=False) if m[1]]
+        feature_type = self.feature_type
 
         arc_map = self.get_arc_map_names()[0]  # only one file
         node_map = self.get_node_map_names()[0]  # only one file
 
-        for map_name, path_name, inter_name in (arc_map, node_map):
-            _err, _errors = self.make_vector_map(map_name=map_name)
+        # both imports run at the same time, then they are completed one by one
+        processes = [self.start_vector_map(map_name) for map_name, _, _ in (arc_map, node_map)]
+
+        for (map_name, path_name, inter_name), process in zip((arc_map, node_map), processes):
+            _err, _errors = self.finish_vector_map(map_name, process)
             if _err:
-                self.append_error(msgs=_errors, typ=self.get_feature_type())
+                self.append_err_msgs(_errors, feature_type)
             else:
                 self.summary.set_process_line(msg_name='import_maps', check_error=_err,
                                               map_path=path_name, output_name=map_name)
 
-        return self.check_errors(types=[self.get_feature_type()]), self.get_errors()
+        return self.check_errors(types=[feature_type]), self.get_errors()
 
     def set_map_names(self):
         for map_name, map_path in self.get_geo_file_path(is_arc=True):
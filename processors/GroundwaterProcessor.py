@@ -1,14 +1,14 @@
 import time
 from collections import namedtuple
 
-from grass.pygrass.vector import VectorTopo
-
 from utils.Config import ConfigApp
 from utils.Errors import ErrorManager
 from processors.FeatureProcessor import FeatureProcess
 from processors.GeoKernel import GeoKernel
 from utils.Utils import TimerSummary
 
+Cell = namedtuple('Cell_gw', ['row', 'col'])  # grid cell key (row and column in the linkage grid)
+
 
 class GroundwaterProcess(FeatureProcess):
     """
@@ -147,25 +147,23 @@ class GroundwaterProcess(FeatureProcess):
         self.stats['FEATURES PROCESSED'] = '{}'.format(len(self._gw_names))
         self.stats['PROCESSED TIME'] = '{0:.2f} seg'.format(te - ts)
 
+        feature_type = self.get_feature_type()
+        summary = self.summary
+
         # Set inputs into summary
         # # set main field in map
-        field = self.config.get_config_field_name(feature_type=self.get_feature_type(), field_type='main')
-        self.summary.set_input_param(param_name='FIELD NAME', param_value='[{}]'.format(field))
+        field = self.config.get_config_field_name(feature_type=feature_type, field_type='main')
+        summary.set_input_param(param_name='FIELD NAME', param_value='[{}]'.format(field))
 
         # # imported file
-        map_names = [m for m in self.get_map_names(only_names=True, with_main_file=True, imported=True) if m[1]]
-        for map_name in map_names:
-            imported = self.map_names[map_name]['imported']
-            if imported:
-                self.summary.set_input_param(param_name='MAP {}'.format(map_name), param_value='[imported]')
-            else:
-                self.summary.set_input_param(param_name='MAP {}'.format(map_name), param_value='[not imported]')
-
-        # Set stats into summary
-        # # set cells
-        self.stats['PROCESSED CELLS'] = len(self.cells)
-        for stat_key in self.stats:
-            self.summary.set_input_param(param_name=stat_key, param_value='[{}]'.format(self.stats[stat_key]))
+        map_names = self.get_map_names(only_names=True, with_main_file=True, imported=True)
+        params = {'MAP {}'.format(map_name): '[imported]' if self.map_names[map_name]['imported'] else '[not imported]'
+                  for map_name in map_names}
+
+        # Set stats into summary ('PROCESSED CELLS' is already set by '_start')
+        params.update({stat_key: f'[{stat_value}]' for stat_key, stat_value in self.stats.items()})
+
+        summary.set_input_params(params)
 
     def set_data_from_geo(self):
         if self.geo:  # set [self.gws] and [self._gw_names]
@@ -174,54 +172,19 @@ class GroundwaterProcess(FeatureProcess):
         return True, []
 
     def get_feature_id_by_name(self, feature_name):
-        feature_id = self._gw_names[feature_name] if feature_name in self._gw_names else None
-        return feature_id
+        return self._gw_names.get(feature_name)
 
     def set_groundwaters(self, groundwaters):
-        self.gws = groundwaters
+        if groundwaters is None:
+            self.gws, self._gw_names = {}, {}
+            return
 
-        self._gw_names = {}
-        for point_id in self.gws:
-            gw_data = self.gws[point_id]
-            self._gw_names[gw_data['name']] = point_id
+        self.gws = groundwaters
+        self._gw_names = {gw_data['name']: point_id for point_id, gw_data in groundwaters.items()}
 
     # @main_task
     def make_cell_data_by_main_map(self, map_name, inter_map_name, inter_map_geo_type):
-        inter_map = VectorTopo(inter_map_name)
-        inter_map.open('r')
-
-        for feature_data in inter_map.viter(vtype=inter_map_geo_type):
-            if feature_data.cat is None:  # when topology has some errors
-                # print("[ERROR] ", a.cat, a.id)
-                continue
-
-            Cell = namedtuple('Cell_gw', ['row', 'col'])
-
-            fields = self.get_needed_field_names(alias=self.get_feature_type())
-            main_field, main_needed = fields['main']['name'], fields['main']['needed']
-            field_feature_name = 'a_' + main_field
-            col_field = 'b_' + self.config.fields_db['linkage']['col_in']
-            row_field = 'b_' + self.config.fields_db['linkage']['row_in']
-
-            feature_name = feature_data.attrs[field_feature_name]
-            cell_area_id = feature_data.attrs['b_cat']  # id from cell in linkage map
-            area_row, area_col = feature_data.attrs[row_field], feature_data.attrs[col_field]
-            feature_area = feature_data.area()
-
-            data = {
-                'area': feature_area,
-                'cell_id': cell_area_id,
-                'name': feature_name,
-                'map_name': map_name
-            }
-
-            cell = Cell(area_row, area_col)
-
-            self._set_cell(cell, feature_name, data, by_field=self.get_order_criteria_name())
-
-            self.cells_by_map[map_name].append(cell) if cell else None  # order cells by map name (will be used in DS)
-
-        inter_map.close()
+        self._set_cells_from_rows(self._read_inter_map_areas(inter_map_name), map_name=map_name, cell_type=Cell)
 
         self.summary.set_process_line(msg_name='make_cell_data_by_main_map', check_error=self.check_errors(types=[self.get_feature_type()]),
                                       map_name=map_name, inter_map_name=inter_map_name,
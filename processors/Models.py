@@ -0,0 +1,229 @@
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(slots=True)
+class RiverBreakNode:
+    """
+        Node that modifies the river flow (tributary inflow, catchment inflow node, river withdrawal or
+        diversion outflow), found on the surface node map. The distances and rivers are set later by each
+        river arc where the node is located (see GeoKernel._get_break_node_distance_from_arc).
+
+        Fields are accessed as attributes. Item access ('node["x"]') is kept for code that still uses
+        the previous dict structure.
+
+
+        Attributes:
+        ----------
+        node_id : int
+            Node ID.
+
+        node_name : str
+            Node name.
+
+        node_type : int
+            Node type ID.
+
+        node_type_name : str
+            Node type name.
+
+        x : float
+            x-axis position of the node.
+
+        y : float
+            y-axis position of the node.
+
+        distance : float
+            Distance from the head of the main river to the node.
+
+        main_river_id : int
+            Arc ID of the main river. Or None.
+
+        main_distance : float
+            Distance from the head of the main river to the node.
+
+        secondary_river_id : int
+            Only for tributary nodes, arc ID of the secondary river. Or None.
+
+        secondary_distance : float
+            Only for tributary nodes, distance from the head of the secondary river to the node.
+
+    """
+    node_id: int
+    node_name: str
+    node_type: int
+    node_type_name: str
+    x: float
+    y: float
+    distance: float | None = None
+    main_river_id: int | None = None
+    main_distance: float | None = None
+    secondary_river_id: int | None = None
+    secondary_distance: float | None = None
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        setattr(self, key, value)
+
+
+class ColumnStore(Mapping):
+    """
+        Base class of the columnar (Struct-of-Arrays) stores. Each column is a list or a numpy array, aligned
+        by position, and '_index' maps the feature ID to its position. Numeric columns use -1 (ID and type
+        columns) or NaN (float columns, where -1 is a valid value) for missing values (None in the rows).
+
+        It works as a read-only mapping {feature ID: row dict}, so the code written for dicts of dicts keeps
+        working, while bulk operations can use the columns directly. The row dicts are built in one pass the first
+        time the store is accessed as a mapping and then reused (plain dict lookups in the per-node loops). Values
+        are changed with 'set_value', which updates the column and the row.
+
+
+        Attributes:
+        ----------
+        columns : Tuple[str]
+            Column names. Each column is an attribute of the store with the same name.
+
+        ids : np.ndarray
+            Feature IDs, in insertion order.
+
+        _index : Dict[int, int]
+            Position of each feature ID in the columns.
+
+        _rows : Dict[int, Dict[str, Any]]
+            Row dicts by feature ID, with python values (None for missing values). Built on the first mapping access.
+
+
+        Methods:
+        -------
+        get_value(self, key, pos)
+            Returns the value of column 'key' at position 'pos' (python type, or None for missing values).
+
+        set_value(self, key, pos, value)
+            Stores 'value' in column 'key' at position 'pos' (and in its row dict, if the rows are built).
+
+        positions(self, ids)
+            Returns the positions of the feature IDs 'ids' (-1 for unknown IDs) as a numpy array.
+
+    """
+    columns = ()
+    _array_columns = {}  # numeric columns (numpy arrays with -1, or NaN for float columns, as missing value)
+
+    @classmethod
+    def _missing_value(cls, key):
+        return np.nan if np.dtype(cls._array_columns[key]).kind == 'f' else -1
+
+    @staticmethod
+    def _is_missing(values):
+        return np.isnan(values) if values.dtype.kind == 'f' else values == -1
+
+    def __init__(self, ids, **columns):
+        # the last row of a repeated ID is kept, at the position where the ID first appeared (like a dict)
+        index = {}
+        for pos, feature_id in enumerate(ids):
+            index[feature_id] = pos
+        keep = list(index.values())
+        self._index = {feature_id: pos for pos, feature_id in enumerate(index)}
+
+        self.ids = np.array(list(index), dtype=np.int64)
+        for key in self.columns:
+            values = [columns[key][pos] for pos in keep]
+            if key in self._array_columns:
+                missing = self._missing_value(key)
+                values = np.array([missing if value is None else value for value in values],
+                                  dtype=self._array_columns[key])
+            setattr(self, key, values)
+
+        self._rows = None
+
+    def _get_rows(self):
+        if self._rows is None:
+            columns = []
+            for key in self.columns:
+                values = getattr(self, key)
+                if key in self._array_columns:
+                    values = [None if is_missing else value
+                              for value, is_missing in zip(values.tolist(), self._is_missing(values).tolist())]
+                columns.append(values)
+
+            keys = self.columns
+            self._rows = {feature_id: dict(zip(keys, row_values))
+                          for feature_id, row_values in zip(self._index, zip(*columns))}
+        return self._rows
+
+    def get_value(self, key, pos):
+        value = getattr(self, key)[pos]
+        if key in self._array_columns:
+            return None if self._is_missing(value) else value.item()
+        return value
+
+    def set_value(self, key, pos, value):
+        if self._rows is not None:
+            self._rows[self.ids[pos].item()][key] = value
+        if key in self._array_columns and value is None:
+            value = self._missing_value(key)
+        getattr(self, key)[pos] = value
+
+    def positions(self, ids):
+        index = self._index
+        ids = ids.tolist() if isinstance(ids, np.ndarray) else ids
+        return np.fromiter((index.get(feature_id, -1) for feature_id in ids), dtype=np.int64, count=len(ids))
+
+    def __getitem__(self, feature_id):
+        return self._get_rows()[feature_id]
+
+    def __contains__(self, feature_id):
+        return feature_id in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def values(self):
+        return self._get_rows().values()
+
+    def items(self):
+        return self._get_rows().items()
+
+
+class NodeStore(ColumnStore):
+    """
+        Nodes of the surface node map in columns (see 'ColumnStore'), indexed by node ID (ObjID). The columns
+        are 'type_id', 'name', 'x', 'y' and 'cat'. The coordinates use NaN for missing values, since -1.0 is a valid
+        coordinate, and 'cat' is a plain list (no sentinel value).
+
+
+        Methods:
+        -------
+        get_type_ids(self, node_ids)
+            Returns the type IDs of the nodes 'node_ids' as a numpy array (-1 for unknown nodes).
+
+    """
+    columns = ('type_id', 'name', 'x', 'y', 'cat')
+    _array_columns = {'type_id': np.int32, 'x': np.float64, 'y': np.float64}
+
+    def __init__(self, ids=(), type_id=(), name=(), x=(), y=(), cat=()):
+        super().__init__(ids, type_id=type_id, name=name, x=x, y=y, cat=cat)
+
+    def get_type_ids(self, node_ids):
+        positions = self.positions(node_ids)
+        if not len(self.type_id):
+            return np.full(len(positions), -1, dtype=np.int32)
+        return np.where(positions >= 0, self.type_id[positions], -1).astype(np.int32)
+
+
+class ArcStore(ColumnStore):
+    """
+        Arcs of the surface arc map in columns (see 'ColumnStore'), indexed by arc ID (ObjID). The columns are
+        'type_id', 'src_id' and 'dst_id' (-1 in the arrays, None through the rows, for arcs without nodes).
+    """
+    columns = ('type_id', 'src_id', 'dst_id')
+    _array_columns = {'type_id': np.int32, 'src_id': np.int64, 'dst_id': np.int64}
+
+    def __init__(self, ids=(), type_id=(), src_id=(), dst_id=()):
+        super().__init__(ids, type_id=type_id, src_id=src_id, dst_id=dst_id)
@@ -1,7 +1,7 @@
+import sqlite3
 import time
 from collections import namedtuple
 
-from grass.exceptions import GrassError
 from grass.pygrass.vector import VectorTopo
 
 from utils.Utils import GrassCoreAPI, TimerSummary
@@ -11,6 +11,8 @@ from processors.FeatureProcessor import FeatureProcess
 from processors.GeoKernel import GeoKernel
 from utils.RiverNode import RiverNode
 
+Cell = namedtuple('Cell_river', ['row', 'col'])  # grid cell key (row and column in the linkage grid)
+
 
 class RiverProcess(FeatureProcess):
     """
@@ -52,7 +54,7 @@ class RiverProcess(FeatureProcess):
         _river_names : Dict[str, int]
             It is used internally to directly access rivers data by name.
 
-        river_break_nodes : Dict[int, Dict[str, str | int | bool]]
+        river_break_nodes : Dict[int, RiverBreakNode]
             Stores nodes that modify the river flow. Indexed by node ID.
 
                 Almacena los nodos que intervienen el flujo del rio. obtenidos del analisis de las geometrias del
@@ -93,6 +95,13 @@ class RiverProcess(FeatureProcess):
             Create segments vector map from rivers found in surface arc map. The parameters 'segments_map_name' is used
             to give the name to the map, That map is intersected with GW grid vector map.
 
+        _read_inter_map_lengths(self, inter_map_name)
+            Returns the rows (river name, segment name, cell ID, row, column, length) of the lines of the
+            intersection map 'inter_map_name', read with one query. Lengths are computed with (v.to.db).
+
+        _make_row_cell_data(row, map_name, name_cache)
+            Converts one row of '_read_inter_map_lengths' into the river cell data (see FeatureProcess).
+
 
 
         Example:
@@ -178,99 +187,100 @@ class RiverProcess(FeatureProcess):
         self.stats['FEATURES PROCESSED'] = '{}'.format(len(self._river_names))
         self.stats['PROCESSED TIME'] = '{0:.2f} seg'.format(te - ts)
 
+        feature_type = self.get_feature_type()
+        summary = self.summary
+
         # Set inputs into summary
         # # set main field in map
-        field_river = self.config.get_config_field_name(feature_type=self.get_feature_type(), field_type='main')
-        field_segment = self.config.get_config_field_name(feature_type=self.get_feature_type(), field_type='secondary')
-        self.summary.set_input_param(param_name='FIELDS NAME', param_value='[{}] and [{}]'.format(field_river, field_segment))
+        field_river = self.config.get_config_field_name(feature_type=feature_type, field_type='main')
+        field_segment = self.config.get_config_field_name(feature_type=feature_type, field_type='secondary')
+        summary.set_input_param(param_name='FIELDS NAME', param_value='[{}] and [{}]'.format(field_river, field_segment))
 
         # # imported file
-        map_names = [m for m in self.get_map_names(only_names=True, with_main_file=True, imported=True) if m[1]]
-        for map_name in map_names:
-            imported = self.map_names[map_name]['imported']
-            if imported:
-                self.summary.set_input_param(param_name='MAP {}'.format(map_name), param_value='[imported]')
-            else:
-                self.summary.set_input_param(param_name='MAP {}'.format(map_name), param_value='[not imported]')
+        map_names = self.get_map_names(only_names=True, with_main_file=True, imported=True)
+        params = {'MAP {}'.format(map_name): '[imported]' if self.map_names[map_name]['imported'] else '[not imported]'
+                  for map_name in map_names}
 
         # Set stats into summary
         # # set cells
         self.stats['PROCESSED CELLS'] = len(self.cells)
-        for stat_key in self.stats:
-            self.summary.set_input_param(param_name=stat_key, param_value='[{}]'.format(self.stats[stat_key]))
+        params.update({stat_key: f'[{stat_value}]' for stat_key, stat_value in self.stats.items()})
+
+        summary.set_input_params(params)
 
     def set_data_from_geo(self):
-        if self.geo:  # set [self.gws] and [self._gw_names]
+        if self.geo:  # set [self.rivers], [self.river_break_nodes] and [self._river_names]
             self.set_rivers(rivers=self.geo.get_rivers(), river_break_nodes=self.geo.get_river_break_nodes())
 
     def get_feature_id_by_name(self, feature_name):
-        feature_id = self._river_names[feature_name] if feature_name in self._river_names else None
-        return feature_id
+        return self._river_names.get(feature_name)
 
     def set_rivers(self, rivers, river_break_nodes):
+        # both dicts are kept by reference (not copied), they are the same objects of the GeoKernel instance,
+        # so removing Canal break nodes in '_make_river_tree_segments_structure' is seen by GeoKernel too
         self.rivers = rivers
         self.river_break_nodes = river_break_nodes
 
-        self._river_names = {}
-        for point_id in self.rivers:
-            river_data = self.rivers[point_id]
-            self._river_names[river_data['name']] = point_id
+        self._river_names = {river_data['name']: point_id for point_id, river_data in rivers.items()}
 
     def _make_river_tree_segments_structure(self):
+        if not self.river_break_nodes:  # without break nodes there is no structure to make
+            return None
+
         root = self.root
+        rivers = self.rivers
+
+        # columns of the break nodes to be linked (one pass over the nodes)
+        node_ids, node_names, node_types, xs, ys, distances = [], [], [], [], [], []
+        main_rivers, secondary_rivers, secondary_distances = [], [], []
+        to_remove = []
+        for key_name, break_node in self.river_break_nodes.items():
+            # [CANAL NOT IMPLEMENTED] Canal must be ingnored because WEAP has not implemented this type to be linked.
+            main_river_data = rivers[break_node.main_river_id]
+            if main_river_data['type'] == 15:  # it is a Canal
+                to_remove.append(key_name)
+                continue
 
-        break_keys = [k for k in self.river_break_nodes.keys() if k != '_by_name']
-        if break_keys:
-            # make real structure
-            for key_name in break_keys:
-                break_node = self.river_break_nodes[key_name]
-
-                # [CANAL NOT IMPLEMENTED] Canal must be ingnored because WEAP has not implemented this type to be linked.
-                # delete Canal break nodes
-                arc_id = break_node['main_river_id']
-                arc_type = self.rivers[arc_id]['type']
-                if arc_type == 15:  # it is a Canal
-                    self.river_break_nodes.pop(key_name)
-                    continue
-
-                break_node_id = break_node['node_id']
-                break_node_name = break_node['node_name']
-                break_node_type = break_node['node_type']
-                break_node_distance = break_node['distance']
-                break_node_x, break_node_y = break_node['x'], break_node['y']
-
-                # make an initial node
-                river_node = RiverNode(node_id=break_node_id, node_name=break_node_name, node_type=break_node_type,
-                                       node_distance=break_node_distance, root_node=root, parent=root)
-                river_node.set_coords(break_node_x, break_node_y)
-
-                # set main river
-                main_river_id = self.river_break_nodes[key_name]['main_river_id']
-                main_distance = self.river_break_nodes[key_name]['distance']  # between node to river
-                main_river_data = self.rivers[main_river_id]
-                river_node.set_main_river(main_river_data['id'], main_river_data['name'], main_river_data['cat'],
-                                          main_distance)
-
-                # if it is a inflow node, it marks secondary node
-                if break_node_type == 13:  # Tributary node
-                    # get secondary river data
-                    secondary_river_id = self.river_break_nodes[key_name]['secondary_river_id']
-                    secondary_distance = self.river_break_nodes[key_name]['secondary_distance']
-
-                    if secondary_river_id in self.rivers:
-                        secondary_river_data = self.rivers[secondary_river_id]
-                        river_node.set_secondary_river(secondary_river_data['id'], secondary_river_data['name'],
-                                                       secondary_river_data['cat'], secondary_distance)
-
-            # for pre, fill, node in RenderTree(root):
-            #     print("%s %s | x=%s | y=%s | dist=%s | id=%s | cat=%s" %
-            #           (pre, node.node_name, node.x, node.y, node.node_distance, node.node_id, node.node_cat))
-
-            segments = root.get_segments_list()
-            # for seg in segments:
-            #     print(seg)
-        else:
-            root = None
+            node_ids.append(break_node.node_id)
+            node_names.append(break_node.node_name)
+            node_types.append(break_node.node_type)
+            xs.append(break_node.x)
+            ys.append(break_node.y)
+            distances.append(break_node.distance)  # between node to river
+            main_rivers.append(main_river_data)
+            secondary_rivers.append(rivers.get(break_node.secondary_river_id))
+            secondary_distances.append(break_node.secondary_distance)
+
+        # delete Canal break nodes (after the pass, not while iterating)
+        for key_name in to_remove:
+            self.river_break_nodes.pop(key_name, None)
+
+        # make real structure
+        for (break_node_id, break_node_name, break_node_type, break_node_x, break_node_y, break_node_distance,
+             main_river_data, secondary_river_data, secondary_distance) in zip(
+                node_ids, node_names, node_types, xs, ys, distances,
+                main_rivers, secondary_rivers, secondary_distances):
+            # make an initial node
+            river_node = RiverNode(node_id=break_node_id, node_name=break_node_name, node_type=break_node_type,
+                                   node_distance=break_node_distance, root_node=root, parent=root)
+            river_node.set_coords(break_node_x, break_node_y)
+
+            # set main river
+            river_node.set_main_river(main_river_data['id'], main_river_data['name'], main_river_data['cat'],
+                                      break_node_distance)
+
+            # if it is a inflow node, it marks secondary node
+            if break_node_type == 13 and secondary_river_data is not None:  # Tributary node
+                river_node.set_secondary_river(secondary_river_data['id'], secondary_river_data['name'],
+                                               secondary_river_data['cat'], secondary_distance)
+
+        # for pre, fill, node in RenderTree(root):
+        #     print("%s %s | x=%s | y=%s | dist=%s | id=%s | cat=%s" %
+        #           (pre, node.node_name, node.x, node.y, node.node_distance, node.node_id, node.node_cat))
+
+        segments = root.get_segments_list()
+        # for seg in segments:
+        #     print(seg)
 
         return root
 
@@ -284,24 +294,27 @@ class RiverProcess(FeatureProcess):
         root_node = self.root
 
         # create attribute table and link with vector map
-        columns_str = ','.join(['{} {}'.format(col[0], col[1]) for col in columns])  # columns format
+        columns_str = ','.join(f'{col_name} {col_type}' for col_name, col_type in columns)  # columns format
         GrassCoreAPI.create_table_attributes(segments_map_name, columns_str, layer=1)
 
-        # set break names in map
+        # set break names in map (only attributes change, geometries are not rewritten)
         segment_map = VectorTopo(segments_map_name)
-        segment_map.open('rw')
+        segment_map.open('r')
 
-        for feature in segment_map.viter('lines'):
-            segment_break_name, river_name = root_node.get_segment_break_name(feature.cat)
+        # a segment can be split in many lines with the same cat, its names are looked up and written once
+        cats = dict.fromkeys(feature.cat for feature in segment_map.viter('lines') if feature.cat is not None)
 
-            # table columns: ([cat], [segment_break_name] [river_name])
-            f_attrs = (segment_break_name, river_name)
-            try:
-                segment_map.rewrite(feature, cat=feature.cat, attrs=f_attrs)
-            except GrassError as e:
-                # print('ERROR writing in segment map  - cat={}'.format(feature.cat))
-                continue
-        segment_map.table.conn.commit()
+        # rows: ([segment_break_name], [river_name], [cat])
+        rows = [root_node.get_segment_break_name(cat) + (cat,) for cat in cats]
+
+        sql = 'UPDATE {} SET segment_break_name=?, river_name=? WHERE cat=?'.format(segment_map.table.name)
+        conn = segment_map.table.conn
+        try:
+            conn.executemany(sql, rows)
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            _err, _errors = True, ['ERROR writing break names in segment map [{}]: {}'.format(segments_map_name, e)]
 
         segment_map.close()
 
@@ -345,49 +358,53 @@ class RiverProcess(FeatureProcess):
 
         return self.check_errors(types=[self.get_feature_type()]), self.get_errors()
 
-    # @main_task
-    def make_cell_data_by_main_map(self, map_name, inter_map_name, inter_map_geo_type):
-        inter_map = VectorTopo(inter_map_name)
-        inter_map.open('r')
+    def _read_inter_map_lengths(self, inter_map_name):
+        # field names in the intersection map ('a_': segment map, 'b_': linkage map)
+        fields = self.get_needed_field_names(alias=self.get_feature_type())
+        field_feature_name = 'a_' + fields['main']['name']
+        field_subfeature_name = 'a_' + fields['secondary']['name']
+        col_field = 'b_' + self.config.fields_db['linkage']['col_in']
+        row_field = 'b_' + self.config.fields_db['linkage']['row_in']
 
-        for feature_data in inter_map.viter(vtype=inter_map_geo_type):
-            if feature_data.cat is None:  # when topology has some errors
-                # print("[ERROR] ", a.cat, a.id)
-                continue
+        # lengths are computed for all the intersection lines at once and read with the other attributes
+        length_field = GrassCoreAPI.add_length_column(map_name=inter_map_name, column='inter_length')
 
-            Cell = namedtuple('Cell_river', ['row', 'col'])
+        inter_map = VectorTopo(inter_map_name)
+        inter_map.open('r')
 
-            fields = self.get_needed_field_names(alias=self.get_feature_type())
-            main_field, main_needed = fields['main']['name'], fields['main']['needed']
-            second_field, second_needed = fields['secondary']['name'], fields['secondary']['needed']
+        # one SELECT for all the intersection lines (lines without category have no row)
+        inter_attrs = GrassCoreAPI.get_attributes_by_cat(vector_map=inter_map, key_column='cat',
+                                                         columns=[field_feature_name, field_subfeature_name, 'b_cat',
+                                                                  row_field, col_field, length_field])
 
-            field_feature_name = 'a_' + main_field
-            field_subfeature_name = 'a_' + second_field
-            col_field = 'b_' + self.config.fields_db['linkage']['col_in']
-            row_field = 'b_' + self.config.fields_db['linkage']['row_in']
+        inter_map.close()
 
-            subfeature_name = feature_data.attrs[field_subfeature_name]
-            feature_name = feature_data.attrs[field_feature_name]
-            cell_area_id = feature_data.attrs['b_cat']  # id from cell in linkage map
-            area_row, area_col = feature_data.attrs[row_field], feature_data.attrs[col_field]
-            line_length = feature_data.length()
+        return list(inter_attrs.values())
 
-            data = {
-                'length': line_length,
-                'cell_id': cell_area_id,
-                'segment_name': subfeature_name,
-                'river_name': feature_name,
-                'name': '{},{}'.format(feature_name, subfeature_name),
-                'map_name': map_name
-            }
+    @staticmethod
+    def _make_row_cell_data(row, map_name, name_cache):
+        # row from '_read_inter_map_lengths' => (river name, cell row, cell column, cell data)
+        feature_name, subfeature_name, cell_area_id, area_row, area_col, line_length = row
 
-            cell = Cell(area_row, area_col)
+        # 'cell_area_id': id from cell in linkage map
+        feature_name = name_cache.setdefault(feature_name, feature_name)
+        subfeature_name = name_cache.setdefault(subfeature_name, subfeature_name)
 
-            self._set_cell(cell, feature_name, data, by_field=self.get_order_criteria_name())
+        data = {
+            'length': line_length,
+            'cell_id': cell_area_id,
+            'segment_name': subfeature_name,
+            'river_name': feature_name,
+            'name': '{},{}'.format(feature_name, subfeature_name),
+            'map_name': map_name
+        }
 
-            self.cells_by_map[map_name].append(cell)  # order cells by map name (be used in DS)
+        return feature_name, area_row, area_col, data
 
-        inter_map.close()
+    # @main_task
+    def make_cell_data_by_main_map(self, map_name, inter_map_name, inter_map_geo_type):
+        self._set_cells_from_rows(self._read_inter_map_lengths(inter_map_name=inter_map_name), map_name=map_name,
+                                  cell_type=Cell)
 
         self.summary.set_process_line(msg_name='make_cell_data_by_main_map', check_error=self.check_errors(types=[self.get_feature_type()]),
                                       map_name=map_name, inter_map_name=inter_map_name,
@@ -4,15 +4,29 @@ import sys
 import subprocess
 import importlib
 import importlib.metadata
+import importlib.util
+import os
 import re
+from collections import defaultdict
+from types import MappingProxyType
 
 
 CONFIG_GRASS_PATH = ''
 
+PKG_NAME_SEP_RE = re.compile(r"[-_.]+")  # separators in package names (PEP 503 normalization)
+
+PACKAGES_FOUND = set()  # required packages already found in this interpreter (they are not looked up again)
+
+PIP_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'geolinkage-pip')  # pip HTTP and wheel cache
+
+# summary section rules (built once)
+SUMMARY_RULE = '=' * 25
+SUMMARY_SUBRULE = '-' * 25
+
 
 class SetupStatus:
-    # Paquetes usados en la aplicacion
-    PACKAGES = {
+    # Paquetes usados en la aplicacion (solo lectura, compartido por todas las instancias)
+    PACKAGES = MappingProxyType({
         'numpy': {
             'version': '1.26.4',
             'module': 'numpy'
@@ -23,7 +37,7 @@ class SetupStatus:
         },
         'grass-session': {
             'version': '0.5',
-            'module': 'grass-session'
+            'module': 'grass_session'
         },
         'flopy': {
             'version': '3.7.0',
@@ -35,7 +49,7 @@ class SetupStatus:
         },
         'pyshp': {
             'version': '2.3.1',
-            'module': 'pyshp'
+            'module': 'shapefile'
         },
         'pandas': {
             'version': '2.2.3',
@@ -45,13 +59,14 @@ class SetupStatus:
             'version': '0.13.2',
             'module': 'seaborn'
         },
-    }
+    })
+    # (package, version, module) of each package, to iterate them without nested lookups
+    PACKAGE_SPECS = tuple((package, info['version'], info['module']) for package, info in PACKAGES.items())
 
     def __init__(self):
-        self.PACKAGES = SetupStatus.PACKAGES.copy()
-        self.process_lines = {}
+        self.process_lines = defaultdict(list)
         self.package_lines = {}
-        self.reqs = {}
+        self.reqs = defaultdict(list)
 
         self.packages_installed = []
         self.packages_missed = []
@@ -69,10 +84,7 @@ class SetupStatus:
             'status': status
         }
 
-        if req in self.reqs:
-            self.reqs[req].append(line)
-        else:
-            self.reqs[req] = [line]
+        self.reqs[req].append(line)
 
         if status == 'ERROR':
             self._ERROR_REQ = True
@@ -87,20 +99,25 @@ class SetupStatus:
         return self.packages_missed
     
     def pkg_name_normalize(self, package):
-        pkg = re.sub(r"[-_.]+", "-", package).lower()
+        pkg = PKG_NAME_SEP_RE.sub("-", package).lower()
         return pkg
 
     def check_packages(self):
-        required = self.PACKAGES.keys()
-        package_installed = {self.pkg_name_normalize(x.name) for x in importlib.metadata.distributions()}
-        self.packages_missed = required - package_installed
-
-        for package in required:
-            self.package_lines[package] = {}
-            if package in package_installed:
-                self.package_lines[package]['status'] = 'FOUND'
-            else:
-                self.package_lines[package]['status'] = 'NOT FOUND'
+        self.packages_missed = []
+
+        # targeted metadata lookup for each required package (no walk over all the installed distributions)
+        for package, _, _ in self.PACKAGE_SPECS:
+            if package in PACKAGES_FOUND:  # found by a previous check
+                self.package_lines[package] = {'status': 'FOUND'}
+                continue
+
+            try:
+                importlib.metadata.version(self.pkg_name_normalize(package))
+                self.package_lines[package] = {'status': 'FOUND'}
+                PACKAGES_FOUND.add(package)
+            except importlib.metadata.PackageNotFoundError:
+                self.package_lines[package] = {'status': 'NOT FOUND'}
+                self.packages_missed.append(package)
 
         self._MISSED_PAQ = len(self.packages_missed) > 0
 
@@ -113,10 +130,7 @@ class SetupStatus:
             'info': info
         }
 
-        if package in self.process_lines:
-            self.process_lines[package].append(line)
-        else:
-            self.process_lines[package] = [line]
+        self.process_lines[package].append(line)
 
     def get_summary(self):
         summary_text = self.summary.get_summary(reqs_status=self.reqs, packages_status=self.package_lines,
@@ -140,46 +154,42 @@ class SummaryStatus:
     def get_summary(self, reqs_status, packages_status, process_status):
         packages = SetupStatus.PACKAGES
 
+        # title lines are stored as dicts, only their message is printed. The status lines are built in a local
+        # list, so repeated calls don't accumulate them in 'self.lines'
+        lines = [line['msg'] for line in self.lines]
+
         # Requirements Status
-        msg_title = '{}\n{}\n{}'.format('=' * 25, 'Requirements Status', '=' * 25)
-        self.lines.append(msg_title)
-        for req_name in reqs_status:
-            for req in reqs_status[req_name]:
-                req_name, req_msg, req_status = req['req'], req['msg'], req['status']
+        lines += [SUMMARY_RULE, 'Requirements Status', SUMMARY_RULE]
+        for req_name, reqs in reqs_status.items():
+            for req in reqs:
+                req_msg, req_status = req['msg'], req['status']
                 msg_info = '    (*) {}: [{}]'.format(req_msg, req_status)
-                self.lines.append(msg_info)
-        self.lines.append("\n")
+                lines.append(msg_info)
+        lines.append('')  # blank line
 
         # Packages Status
-        msg_title = '{}\n{}\n{}'.format('=' * 25, 'Packages Status', '=' * 25)
-        self.lines.append(msg_title)
-        for package in packages_status:
-            package_status, package_version = packages_status[package]['status'], packages[package]['version']
+        lines += [SUMMARY_RULE, 'Packages Status', SUMMARY_RULE]
+        for package, package_line in packages_status.items():
+            package_status, package_version = package_line['status'], packages[package]['version']
             msg_info = '   (+) {} (version: {}): [{}]'.format(package, package_version, package_status)
-            self.lines.append(msg_info)
-        self.lines.append("\n")
+            lines.append(msg_info)
+        lines.append('')  # blank line
 
         # Process Status
-        msg_title = '{}\n{}\n{}'.format('-' * 25, 'Process Status', '-' * 25)
-        self.lines.append(msg_title)
-        for process_name in process_status:
+        lines += [SUMMARY_SUBRULE, 'Process Status', SUMMARY_SUBRULE]
+        for process_name, processes in process_status.items():
+            msg_format = '    (*)=> {}: [{}]' if process_name in reqs_status else '    (+)=> {}: [{}]'
 
-            for process in process_status[process_name]:
+            for process in processes:
                 proc_info, proc_msg, proc_status = process['info'], process['msg'], process['status']
 
-                if process_name in reqs_status:
-                    msg_info = '    (*)=> {}: [{}]'.format(proc_msg, proc_status)
-                else:
-                    msg_info = '    (+)=> {}: [{}]'.format(proc_msg, proc_status)
-                self.lines.append(msg_info)
-
+                lines.append(msg_format.format(proc_msg, proc_status))
                 if proc_info:
-                    msg_comment = '      {}'.format(proc_info)
-                    self.lines.append(msg_comment)
-            self.lines.append("\n")
-        self.lines.append("\n")
+                    lines.append('      {}'.format(proc_info))
+            lines.append('')  # blank line
+        lines.append('')  # blank line
 
-        summary_text = '\n'.join(self.lines)
+        summary_text = '\n'.join(lines)
 
         return summary_text
 
@@ -188,35 +198,65 @@ class SummaryStatus:
 
 
 def import_package(package, summary):
-    packages = summary.get_packages()
+    import_packages([package], summary=summary)
+
+
+def import_packages(packages, summary):
+    packages = set(packages)
 
-    module = packages[package]['module']
-    version = packages[package]['version']
+    # search each package, the missing ones are installed together
+    to_install = []
+    for package, version, module in summary.PACKAGE_SPECS:
+        if package not in packages:
+            continue
+        msg_search = 'Searching package: [{}]'.format(package)
 
-    msg_search = 'Searching package: [{}]'.format(package)
-    msg_install = 'Installing package: [{}] v{}'.format(package, version)
+        # the module is only searched (its code is not executed)
+        if importlib.util.find_spec(module) is not None:
+            summary.add_process_msg(package=package, msg=msg_search, status='FOUND')
+        else:
+            summary.add_process_msg(package=package, msg=msg_search, status='NOT FOUND')
+            to_install.append((package, version))
+
+    if not to_install:
+        return
 
+    # only one pip process (one startup and one dependency resolution) for all the missing packages
+    requirements = ['{}=={}'.format(package, version) for package, version in to_install]
     try:
-        importlib.import_module(module)
-        summary.add_process_msg(package=package, msg=msg_search, status='FOUND')
-    except ModuleNotFoundError:
-        summary.add_process_msg(package=package, msg=msg_search, status='NOT FOUND')
+        subprocess.run([sys.executable, "-m", "pip", "install", "--no-input", "--disable-pip-version-check",
+                        "--cache-dir", PIP_CACHE_DIR, "--prefer-binary", *requirements], check=True)
+    except subprocess.CalledProcessError:
+        pass  # the installed packages are checked one by one below
+
+    for (package, version), requirement in zip(to_install, requirements):
+        msg_install = 'Installing package: [{}] v{}'.format(package, version)
         try:
-            subprocess.run([sys.executable, "-m", "pip", "install", '{}=={}'.format(package, version)], check=True)
+            importlib.metadata.version(summary.pkg_name_normalize(package))
             summary.add_process_msg(package=package, msg=msg_install, status='INSTALLED')
-        except subprocess.CalledProcessError:
-            msg_info = 'Need to be manually installed: pip install {}=={}'.format(package, version)
+        except importlib.metadata.PackageNotFoundError:
+            msg_info = 'Need to be manually installed: pip install {}'.format(requirement)
             summary.add_process_msg(package=package, msg=msg_install, status='NOT INSTALLED', info=msg_info)
 
 
 def set_ld_library():
-    import os
     os.environ['LD_LIBRARY_PATH'] = '/var/test2'
 
 
 def grass_check():
+    global CONFIG_GRASS_PATH
+
+    if CONFIG_GRASS_PATH:  # already found
+        return True
+
+    gisbase = os.environ.get('GISBASE')  # set inside a GRASS session, no subprocess needed
+    if gisbase and os.path.isdir(gisbase):
+        CONFIG_GRASS_PATH = gisbase
+        return True
+
     try:
-        CONFIG_GRASS_PATH = subprocess.run(["grass", "--config", "path"])
+        grass_config = subprocess.run(["grass", "--config", "path"], capture_output=True, text=True, check=True)
+        CONFIG_GRASS_PATH = grass_config.stdout.strip()
         is_grass = True
     except subprocess.CalledProcessError:
         is_grass = False
@@ -239,7 +279,6 @@ def pip_check():
 
 
 def ld_library_check(grass_path: str = None):
-    import os
     # os.putenv("LD_LIBRARY_PATH", "123")
     grass_lib_path = os.path.join(grass_path, '/lib')
 
@@ -264,9 +303,6 @@ def make_ld_var_config_file():
 
 
 def setup_app():
-    from sys import platform
-    import os
-
     setup_status = SetupStatus()
     # Required checks
     # Grass Requirement
@@ -293,7 +329,7 @@ def setup_app():
         msg_info = '[LD_LIBRARY_PATH] environment variable is correctly set.'
         setup_status.set_req_status(req='LD_LIBRARY_PATH', msg=msg_info, status='OK')
     else:
-        if platform == "linux" or platform == "linux2":
+        if sys.platform == "linux" or sys.platform == "linux2":
             is_ok = make_ld_var_config_file()
 
             msg_info = 'Making config file to set [LD_LIBRARY_PATH]'
@@ -312,10 +348,9 @@ def setup_app():
     is_missed = setup_status.check_packages()
     if is_missed:
         packages_missed = setup_status.get_missed_packages()
-        for package in packages_missed:
-            import_package(package, summary=setup_status)
+        import_packages(packages_missed, summary=setup_status)
     summary_text = setup_status.get_summary()
-    print(summary_text)
+    sys.stdout.write(summary_text + '\n')  # whole summary in one write
 
 
 if __name__ == '__main__':
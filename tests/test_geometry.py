@@ -0,0 +1,57 @@
+import unittest
+
+import numpy as np
+
+from utils.Geometry import HAS_NUMBA, _points_on_polyline_loop, _points_on_polyline_numpy, point_on_polyline
+
+
+class PointsOnPolylineTest(unittest.TestCase):
+    """
+        Both backends of 'points_on_polyline' (numba loop and numpy) must agree for break nodes placed exactly on
+        the arc vertices, with the exact tolerance used by default (config: GEO.BREAK_NODE_TOLERANCE = 0.0).
+    """
+
+    def setUp(self):
+        rng = np.random.default_rng(42)
+        # vertex coordinates where rebuilding the end vertex as 'ax + t * dx' (t = 1) is often not exact
+        self.lines = [(rng.uniform(0.0, 1000.0, 12), rng.uniform(0.0, 1000.0, 12)) for _ in range(200)]
+
+    def _backends(self):
+        # the numba loop is also run as plain Python ('py_func'), the same code used without numba
+        backends = [('numpy', _points_on_polyline_numpy)]
+        if HAS_NUMBA:
+            backends.append(('numba', _points_on_polyline_loop))
+            backends.append(('python', _points_on_polyline_loop.py_func))
+        else:
+            backends.append(('python', _points_on_polyline_loop))
+        return backends
+
+    def test_vertices_on_line(self):
+        for xs, ys in self.lines:
+            expected = np.concatenate(([0.0], np.cumsum(np.hypot(np.diff(xs), np.diff(ys)))))
+
+            for name, backend in self._backends():
+                on_line, distances = backend(xs, ys, xs.copy(), ys.copy(), 0.0)
+
+                self.assertTrue(on_line.all(), msg='{}: vertex not on line'.format(name))
+                np.testing.assert_allclose(distances, expected, rtol=1e-12, err_msg=name)
+
+    def test_scalar_end_vertex(self):
+        point_on_line = getattr(point_on_polyline, 'py_func', point_on_polyline)
+        for xs, ys in self.lines:
+            is_on_line, _ = point_on_line(xs, ys, xs[-1], ys[-1], 0.0)
+            self.assertTrue(is_on_line)
+
+    def test_point_off_line(self):
+        xs, ys = np.array([0.0, 10.0, 10.0]), np.array([0.0, 0.0, 10.0])
+        pxs, pys = np.array([5.0, 5.0, 10.0]), np.array([0.0, 1e-9, 4.0])
+
+        for name, backend in self._backends():
+            on_line, distances = backend(xs, ys, pxs, pys, 0.0)
+
+            self.assertEqual(on_line.tolist(), [True, False, True], msg=name)
+            self.assertEqual(distances.tolist(), [5.0, 0.0, 14.0], msg=name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,17 +1,33 @@
-import json
 import os
-import pathlib
+from functools import lru_cache
+from types import MappingProxyType
 
+try:
+    import orjson
 
+    def _load_json(fp):
+        return orjson.loads(fp.read())
+except ModuleNotFoundError:
+    from json import load as _load_json
+
+_CONFIG_JSON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'config', 'config.json')
+
+
+@lru_cache(maxsize=None)
 def read_config_file():
     # read JSON config file
-    current_folder = pathlib.Path(__file__).parent.absolute()
-    with open(os.path.join(current_folder, '../config/config.json')) as json_data_file:
-        config_data = json.load(json_data_file)
+    with open(_CONFIG_JSON_PATH, 'rb') as json_data_file:
+        config_data = _load_json(json_data_file)
 
     return config_data
 
 
+def _freeze(mapping: dict):
+    # read-only view of a dict and its nested dicts (lists and other values are kept as they are)
+    return MappingProxyType({key: _freeze(value) if isinstance(value, dict) else value
+                             for key, value in mapping.items()})
+
+
 class ConfigApp:
     """
         Clase utilitaria que contiene las propiedades y metodos para manejar tres tipos basicos de configuraciones de la aplicacion:
@@ -67,6 +83,19 @@ class ConfigApp:
             Almacena la configuracion usada por las clases (procesadores) para saber cuales on las principales columnas
             de la metadata que deben existir en los mapas de entrada.
 
+        break_node_tolerance : float
+            Distancia maxima entre un nodo que modifica el caudal del rio y un arco de rio para considerar que el nodo
+            esta sobre el arco. Se obtiene desde el archivo de configuracion (variable: config_data["GEO"]["BREAK_NODE_TOLERANCE"]),
+            por defecto 0.0 (el punto mas cercano del arco debe coincidir con el nodo).
+
+        _needed_fields_cache : Dict[Tuple[str, bool, bool], Dict[str, Dict[str, str | bool]]]
+            Resultados de 'get_needed_fields' por (alias, is_node, is_arc). Se limpia cuando 'set_config_field' cambia
+            el nombre de alguna columna. Los diccionarios retornados son compartidos, no deben modificarse.
+
+        _field_names_cache : Dict[Tuple[str, str], str]
+            Resultados de 'get_config_field_name' por (feature_type, field_type). Se limpia junto con
+            '_needed_fields_cache'.
+
         _feature_opts : Dict[str, Any]
             Parametros de configuracion del procesador, se configuran en cada instancia y para cada caracteristica.
             Actualmente se utilizan dos, 'order_criteria' y 'columns_to_save'.
@@ -81,9 +110,20 @@ class ConfigApp:
             Retorna el numero de columnas que deben crearse en la metadata final para el tipo de caracteristica o
             archivo final dado por el parametro 'feature_type'.
 
+        _get_config_data(cls)
+            Retorna el contenido del archivo './config/config.json'. El archivo se lee la primera vez que se crea
+            una instancia (no al importar el modulo) y luego se reutiliza.
+
+        _get_static_config(cls)
+            Retorna la configuracion de solo lectura ('type_names', 'fields_db', 'cols_linkage', 'process_msgs',
+            nombres de mapas y configuracion de los mapas de arcos y nodos). Se construye una vez y todas las instancias
+            comparten los mismos objetos. Lo modificable ('default_opts', 'fields_needed', 'grass_internals') se
+            construye en cada instancia.
+
         """
 
-    __config_data = read_config_file()
+    __config_data = None  # contenido de './config/config.json' (se lee en la primera instancia)
+    __static_config = None  # configuracion de solo lectura comun a todas las instancias (ver '_get_static_config')
 
     # -[first letter of error]-[main][catchment][gw][river][ds][geo][check][error]
     error_codes = {
@@ -103,17 +143,10 @@ class ConfigApp:
                  debug: bool = False, order_criteria: str = None, columns_to_save: int = None):
 
         # read JSON config file
-        config_data = ConfigApp.__config_data
+        config_data = ConfigApp._get_config_data()
 
-        self.type_names = {
-            'GroundwaterProcess': config_data["FEATURE NAMES"]["groundwater"],
-            'CatchmentProcess': config_data["FEATURE NAMES"]["catchment"],
-            'RiverProcess': config_data["FEATURE NAMES"]["river"],
-            'DemandSiteProcess': config_data["FEATURE NAMES"]["demand sites"],
-            'GeoKernel': config_data["FEATURE NAMES"]["geometry"],
-            'AppKernel': config_data["FEATURE NAMES"]["main program"],
-            'GeoCheck': config_data["FEATURE NAMES"]["geometry checker"],
-        }
+        # read-only configuration, the same objects are shared by all the instances (see '_get_static_config')
+        self.__dict__.update(ConfigApp._get_static_config())
 
         self.grass_internals = {
             'EPSG_CODE': epsg_code,
@@ -124,79 +157,157 @@ class ConfigApp:
 
         self.debug = debug
 
-        # Default names in vector maps
-        self.linkage_out = config_data["DEFAULT MAP NAMES"]["LINKAGE FINAL MAP"]
-        self.segments_map_name = config_data["DEFAULT MAP NAMES"]["RIVER SEGMENTS MAP"]
-        self.inter_river_linkage_name = config_data["DEFAULT MAP NAMES"]["LINKAGE INTER RIVER SEGMENTS MAP"]
-        self.inter_ds_linkage_name = config_data["DEFAULT MAP NAMES"]["LINKAGE INTER DEMAND SITE MAP"]
+        type_names = self.type_names
+        catchment = type_names['CatchmentProcess']
+        groundwater = type_names['GroundwaterProcess']
+        river = type_names['RiverProcess']
+        demand_site = type_names['DemandSiteProcess']
+        geo = type_names['GeoKernel']
+        app = type_names['AppKernel']
+
+        fields_db = self.fields_db
+        overlap_criteria = config_data["CELL OVERLAP CRITERIA"]
+        columns_for_feature = config_data["COLUMNS FOR FEATURE"]
 
         # Default opts
         # # order_criteria: to select between two or more geometries which intersect one cell
         # # columns_to_save: columns to save in final linkage file by feature
-        self.default_opts = {
-            self.type_names['CatchmentProcess']: {
-                'order_criteria': config_data["CELL OVERLAP CRITERIA"]["catchment"],
-                'columns_to_save': config_data["COLUMNS FOR FEATURE"]["catchment"]
+        self.default_opts = MappingProxyType({
+            catchment: {
+                'order_criteria': overlap_criteria["catchment"],
+                'columns_to_save': columns_for_feature["catchment"]
             },
-            self.type_names['GroundwaterProcess']: {
-                'order_criteria': config_data["CELL OVERLAP CRITERIA"]["groundwater"],
-                'columns_to_save': config_data["COLUMNS FOR FEATURE"]["groundwater"]
+            groundwater: {
+                'order_criteria': overlap_criteria["groundwater"],
+                'columns_to_save': columns_for_feature["groundwater"]
             },
-            self.type_names['RiverProcess']: {
-                'order_criteria': config_data["CELL OVERLAP CRITERIA"]["river"],
-                'columns_to_save': config_data["COLUMNS FOR FEATURE"]["river"]
+            river: {
+                'order_criteria': overlap_criteria["river"],
+                'columns_to_save': columns_for_feature["river"]
             },
-            self.type_names['DemandSiteProcess']: {
-                'order_criteria': config_data["CELL OVERLAP CRITERIA"]["demand_site"],
-                'columns_to_save': config_data["COLUMNS FOR FEATURE"]["demand_site"]
+            demand_site: {
+                'order_criteria': overlap_criteria["demand_site"],
+                'columns_to_save': columns_for_feature["demand_site"]
             },
+        })  # feature options are changed through the setters, the feature set is fixed
+
+        self.fields_needed = _freeze({
+            'main': {  # alias: [name, needed]
+                catchment: [fields_db[catchment]['name'], True],
+                groundwater: [fields_db[groundwater]['name'], True],
+                river: [fields_db[river]['river_name'], True],
+                demand_site: [fields_db[demand_site]['name'], True],
+                geo: [[fields_db[geo]['arc_name'], True],   # arc fields
+                      [fields_db[geo]['node_name'], True]],  # node fields
+                app: [fields_db['linkage-in']['row'], True]
+            },
+            'secondary': {
+                catchment: None,
+                groundwater: None,
+                river: [fields_db[river]['segment_break_name'], True],
+                demand_site: None,
+                geo: [[fields_db[geo]['arc_type'], True],    # arc fields
+                      [fields_db[geo]['node_type'], True]],  # node fields
+                app: [fields_db['linkage-in']['col'], True]
+            },
+            'limit': {
+                catchment: [fields_db[catchment]['modflow'], False],
+                groundwater: None,
+                river: None,
+                demand_site: None,
+                geo: None,
+                app: [fields_db['linkage-in']['col'], True]
+            }
+        })  # only the [name, needed] lists are mutable (see 'set_config_field')
+
+        self._needed_fields_cache = {}  # (alias, is_node, is_arc) => result of 'get_needed_fields'
+        self._field_names_cache = {}  # (feature_type, field_type) => result of 'get_config_field_name'
+
+    @classmethod
+    def _get_config_data(cls):
+        if cls.__config_data is None:
+            cls.__config_data = read_config_file()
+        return cls.__config_data
+
+    @classmethod
+    def _get_static_config(cls):
+        if cls.__static_config is None:
+            cls.__static_config = cls._build_static_config(cls._get_config_data())
+        return cls.__static_config
+
+    @staticmethod
+    def _build_static_config(config_data):
+        type_names = {
+            'GroundwaterProcess': config_data["FEATURE NAMES"]["groundwater"],
+            'CatchmentProcess': config_data["FEATURE NAMES"]["catchment"],
+            'RiverProcess': config_data["FEATURE NAMES"]["river"],
+            'DemandSiteProcess': config_data["FEATURE NAMES"]["demand sites"],
+            'GeoKernel': config_data["FEATURE NAMES"]["geometry"],
+            'AppKernel': config_data["FEATURE NAMES"]["main program"],
+            'GeoCheck': config_data["FEATURE NAMES"]["geometry checker"],
         }
 
+        catchment = type_names['CatchmentProcess']
+        groundwater = type_names['GroundwaterProcess']
+        river = type_names['RiverProcess']
+        demand_site = type_names['DemandSiteProcess']
+        geo = type_names['GeoKernel']
+
+        fields_in = config_data["FIELDS IN INPUT MAP"]
+        fields_out = config_data["FIELDS IN OUTPUT FILE"]
+        map_names = config_data["DEFAULT MAP NAMES"]
+
+        # Default names in vector maps
+        linkage_out = map_names["LINKAGE FINAL MAP"]
+        segments_map_name = map_names["RIVER SEGMENTS MAP"]
+        inter_river_linkage_name = map_names["LINKAGE INTER RIVER SEGMENTS MAP"]
+        inter_ds_linkage_name = map_names["LINKAGE INTER DEMAND SITE MAP"]
+
         # Metadata fields in vector maps
-        self.fields_db = {
-            self.type_names['GeoKernel']: {
-                'arc_name': config_data["FIELDS IN INPUT MAP"]["geo_map"]["arc_name"],
-                'node_name': config_data["FIELDS IN INPUT MAP"]["geo_map"]["node_name"],
-                'arc_type': config_data["FIELDS IN INPUT MAP"]["geo_map"]["arc_type"],
-                'node_type': config_data["FIELDS IN INPUT MAP"]["geo_map"]["node_type"]
+        fields_db = {
+            geo: {
+                'arc_name': fields_in["geo_map"]["arc_name"],
+                'node_name': fields_in["geo_map"]["node_name"],
+                'arc_type': fields_in["geo_map"]["arc_type"],
+                'node_type': fields_in["geo_map"]["node_type"]
             },
             'linkage': {  # final linkage file
-                self.type_names['CatchmentProcess']: config_data["FIELDS IN OUTPUT FILE"]["catchment"],
-                self.type_names['GroundwaterProcess']: config_data["FIELDS IN OUTPUT FILE"]["groundwater"],
-                self.type_names['RiverProcess']: config_data["FIELDS IN OUTPUT FILE"]["river"],
-                self.type_names['DemandSiteProcess']: config_data["FIELDS IN OUTPUT FILE"]["demand_site"],
-                'row': config_data["FIELDS IN OUTPUT FILE"]["row"],
-                'col': config_data["FIELDS IN OUTPUT FILE"]["col"],
-                'rc': config_data["FIELDS IN OUTPUT FILE"]["rc"],
+                catchment: fields_out["catchment"],
+                groundwater: fields_out["groundwater"],
+                river: fields_out["river"],
+                demand_site: fields_out["demand_site"],
+                'row': fields_out["row"],
+                'col': fields_out["col"],
+                'rc': fields_out["rc"],
                 'row_in': 'row',
                 'col_in': 'column'
             },
-            self.type_names['CatchmentProcess']: {
-                'name': config_data["FIELDS IN INPUT MAP"]["catchment_map"]["name"],
-                'modflow': config_data["FIELDS IN INPUT MAP"]["catchment_map"]["modflow"]
+            catchment: {
+                'name': fields_in["catchment_map"]["name"],
+                'modflow': fields_in["catchment_map"]["modflow"]
             },
-            self.type_names['GroundwaterProcess']: {
-                'name': config_data["FIELDS IN INPUT MAP"]["gw_map"]["name"]  # GW or GROUNDWAT usually
+            groundwater: {
+                'name': fields_in["gw_map"]["name"]  # GW or GROUNDWAT usually
             },
-            self.type_names['RiverProcess']: {
-                'priority': config_data["FIELDS IN INPUT MAP"]["river_map"]["priority"],  # not used yet
-                'segment_break_name': config_data["FIELDS IN INPUT MAP"]["river_map"]["segment_break_name"],
-                'river_name': config_data["FIELDS IN INPUT MAP"]["river_map"]["river_name"]
+            river: {
+                'priority': fields_in["river_map"]["priority"],  # not used yet
+                'segment_break_name': fields_in["river_map"]["segment_break_name"],
+                'river_name': fields_in["river_map"]["river_name"]
             },
-            self.type_names['DemandSiteProcess']: {
-                'name': config_data["FIELDS IN INPUT MAP"]["ds_map"]["name"]
+            demand_site: {
+                'name': fields_in["ds_map"]["name"]
             },
             'linkage-in': {  # init linkage
-                'row': config_data["FIELDS IN INPUT MAP"]["linkage_in_map"]["row"],
-                'col': config_data["FIELDS IN INPUT MAP"]["linkage_in_map"]["col"]
+                'row': fields_in["linkage_in_map"]["row"],
+                'col': fields_in["linkage_in_map"]["col"]
             }
         }
 
-        self.cols_linkage = {  # linkage-out is based from this
+        cols_linkage = {  # linkage-out is based from this
             'row': {
                 'action': 'rename',
-                'name_old': config_data["FIELDS IN INPUT MAP"]["linkage_in_map"]["row"],
-                'name': config_data["FIELDS IN OUTPUT FILE"]["row"],
+                'name_old': fields_in["linkage_in_map"]["row"],
+                'name': fields_out["row"],
                 'type': 'INT',
                 '_type_name': 'integer',
                 '_necessary': True
@@ -204,8 +315,8 @@ class ConfigApp:
 
             'col': {
                 'action': 'rename',
-                'name_old': config_data["FIELDS IN INPUT MAP"]["linkage_in_map"]["col"],
-                'name': config_data["FIELDS IN OUTPUT FILE"]["col"],
+                'name_old': fields_in["linkage_in_map"]["col"],
+                'name': fields_out["col"],
                 'type': 'INT',
                 '_type_name': 'integer',
                 '_necessary': True
@@ -213,15 +324,15 @@ class ConfigApp:
 
             'rc': {
                 'action': 'add',
-                'name': config_data["FIELDS IN OUTPUT FILE"]["rc"],
+                'name': fields_out["rc"],
                 'type': 'VARCHAR',
                 '_type_name': 'varchar',
                 '_necessary': True
             },
 
-            self.type_names['CatchmentProcess']: {
+            catchment: {
                 'action': 'add',
-                'name': config_data["FIELDS IN OUTPUT FILE"]["catchment"],
+                'name': fields_out["catchment"],
                 'type': 'VARCHAR',
                 '_type_name': 'varchar',
                 '_necessary': True
@@ -229,72 +340,61 @@ class ConfigApp:
 
             'landuse': {
                 'action': 'add',
-                'name': config_data["FIELDS IN OUTPUT FILE"]["landuse"],
+                'name': fields_out["landuse"],
                 'type': 'VARCHAR',
                 '_type_name': 'varchar',
                 '_necessary': True
             },
 
-            self.type_names['GroundwaterProcess']: {
+            groundwater: {
                 'action': 'add',
-                'name': config_data["FIELDS IN OUTPUT FILE"]["groundwater"],
+                'name': fields_out["groundwater"],
                 'type': 'VARCHAR',
                 '_type_name': 'varchar',
                 '_necessary': True
             },
 
-            self.type_names['RiverProcess']: {
+            river: {
                 'action': 'add',
-                'name': config_data["FIELDS IN OUTPUT FILE"]["river"],
+                'name': fields_out["river"],
                 'type': 'VARCHAR', '_type_name': 'varchar',
                 '_necessary': True
             },
 
-            self.type_names['DemandSiteProcess']: {
+            demand_site: {
                 'action': 'add',
-                'name': config_data["FIELDS IN OUTPUT FILE"]["demand_site"],
+                'name': fields_out["demand_site"],
                 'type': 'VARCHAR',
                 '_type_name': 'varchar',
                 '_necessary': True
             },
         }
 
-        self.process_msgs = config_data['PROCESSING LINES']
-
-        self.fields_needed = {
-            'main': {  # alias: [name, needed]
-                self.type_names['CatchmentProcess']: [self.fields_db[self.type_names['CatchmentProcess']]['name'], True],
-                self.type_names['GroundwaterProcess']: [self.fields_db[self.type_names['GroundwaterProcess']]['name'], True],
-                self.type_names['RiverProcess']: [self.fields_db[self.type_names['RiverProcess']]['river_name'], True],
-                self.type_names['DemandSiteProcess']: [self.fields_db[self.type_names['DemandSiteProcess']]['name'], True],
-                self.type_names['GeoKernel']: [[self.fields_db[self.type_names['GeoKernel']]['arc_name'], True],   # arc fields
-                                               [self.fields_db[self.type_names['GeoKernel']]['node_name'], True]],  # node fields
-                self.type_names['AppKernel']: [self.fields_db['linkage-in']['row'], True]
-            },
-            'secondary': {
-                self.type_names['CatchmentProcess']: None,
-                self.type_names['GroundwaterProcess']: None,
-                self.type_names['RiverProcess']: [self.fields_db[self.type_names['RiverProcess']]['segment_break_name'], True],
-                self.type_names['DemandSiteProcess']: None,
-                self.type_names['GeoKernel']: [[self.fields_db[self.type_names['GeoKernel']]['arc_type'], True],    # arc fields
-                                               [self.fields_db[self.type_names['GeoKernel']]['node_type'], True]],  # node fields
-                self.type_names['AppKernel']: [self.fields_db['linkage-in']['col'], True]
-            },
-            'limit': {
-                self.type_names['CatchmentProcess']: [self.fields_db[self.type_names['CatchmentProcess']]['modflow'], False],
-                self.type_names['GroundwaterProcess']: None,
-                self.type_names['RiverProcess']: None,
-                self.type_names['DemandSiteProcess']: None,
-                self.type_names['GeoKernel']: None,
-                self.type_names['AppKernel']: [self.fields_db['linkage-in']['col'], True]
-            }
-        }
+        process_msgs = config_data['PROCESSING LINES']
 
         # prepare arc and node maps configuration
-        self.node_columns = config_data['GEO']['NODE_COL']  # columns to read node map
-        self.arc_columns = config_data['GEO']['ARC_COL']  # columns to read arc map
-        self.nodes_type_id = config_data['GEO']['NODE_TYPE_ID']  # node ids in node map
-        self.arc_type_id = config_data['GEO']['ARC_TYPE_ID']  # arc ids in node map
+        node_columns = config_data['GEO']['NODE_COL']  # columns to read node map
+        arc_columns = config_data['GEO']['ARC_COL']  # columns to read arc map
+        nodes_type_id = config_data['GEO']['NODE_TYPE_ID']  # node ids in node map
+        arc_type_id = config_data['GEO']['ARC_TYPE_ID']  # arc ids in node map
+        # max. distance between a break node and a river arc to consider the node on the arc (0.0: exact match)
+        break_node_tolerance = float(config_data['GEO'].get('BREAK_NODE_TOLERANCE', 0.0))
+
+        return {
+            'type_names': type_names,
+            'linkage_out': linkage_out,
+            'segments_map_name': segments_map_name,
+            'inter_river_linkage_name': inter_river_linkage_name,
+            'inter_ds_linkage_name': inter_ds_linkage_name,
+            'fields_db': _freeze(fields_db),
+            'cols_linkage': _freeze(cols_linkage),
+            'process_msgs': process_msgs,
+            'node_columns': node_columns,
+            'arc_columns': arc_columns,
+            'nodes_type_id': nodes_type_id,
+            'arc_type_id': arc_type_id,
+            'break_node_tolerance': break_node_tolerance,
+        }
 
     def get_order_criteria(self, feature_type: str):
         ret = self.default_opts[feature_type]['order_criteria']
@@ -310,6 +410,10 @@ class ConfigApp:
         self.default_opts[feature_type]['columns_to_save'] = columns_to_save
 
     def get_needed_fields(self, alias: str, is_node: bool = False, is_arc: bool = False):
+        cache_key = (alias, is_node, is_arc)
+        if cache_key in self._needed_fields_cache:
+            return self._needed_fields_cache[cache_key]
+
         fields = {}
 
         if not (is_node or is_arc):
@@ -328,6 +432,8 @@ class ConfigApp:
                         'needed': self.fields_needed[concept][alias][index][1]
                     }
 
+        self._needed_fields_cache[cache_key] = fields
+
         return fields
 
     def get_feature_names(self):
@@ -362,18 +468,26 @@ class ConfigApp:
 
         if field_type in self.fields_needed and feature_type in self.fields_needed[field_type]:
             self.fields_needed[field_type][feature_type][0] = field_new_name
+            self._needed_fields_cache.clear()  # field names changed
+            self._field_names_cache.clear()
         else:
             _err = True
 
         return _err
 
     def get_config_field_name(self, feature_type: str, field_type: str = 'main'):
+        cache_key = (feature_type, field_type)
+        if cache_key in self._field_names_cache:
+            return self._field_names_cache[cache_key]
+
         field_value = None
 
         if field_type in self.fields_needed and feature_type in self.fields_needed[field_type]:
             if self.fields_needed[field_type][feature_type] is not None:
                 field_value = self.fields_needed[field_type][feature_type][0]  # name
 
+        self._field_names_cache[cache_key] = field_value
+
         return field_value
 
     def get_linkage_out_file_name(self):
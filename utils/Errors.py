@@ -39,6 +39,13 @@ class ErrorManager:
     def get_error_types(self):
         return list(self._errors.keys())
 
+    def iter_errors_grouped(self, is_warn: bool = False):
+        # messages are already stored by type, so one pass over the index gives every non-empty group
+        errors = self._warnings if is_warn else self._errors
+        for typ, msgs in errors.items():
+            if msgs:
+                yield typ, msgs
+
     def check_warning(self, types: list = None, typ: str = None, code: str = ''):
         if code:
             if typ:
@@ -113,6 +120,22 @@ class ErrorManager:
 
         self.add_metadata(msg=msg, typ=typ, code=code, is_warn=is_warn) if code else None
 
+    def extend(self, msgs, typ: str = 'other', is_warn: bool = False, code: str = ''):
+        msgs = list(msgs)
+        if not msgs:
+            return
+
+        errors, errors_meta = (self._warnings, self._warnings_meta) if is_warn else (self._errors, self._errors_meta)
+
+        errors[typ if typ in errors else 'other'].extend(msgs)
+
+        if code:
+            meta = errors_meta[typ if typ in errors_meta else 'other']
+            if code in meta:
+                meta[code].extend(msgs)
+            else:
+                meta[code] = msgs
+
     def add_metadata(self, msg: str, typ: str = 'other', is_warn: bool = False, code: str = ''):
         if is_warn:
             if typ in self._warnings_meta:
@@ -225,7 +248,7 @@ class ErrorManager:
             elif types:
                 errors = self.get_warnings(types=types)
             else:  # all errors
-                errors = self.get_warnings(types=list(self._errors.keys()))
+                errors = [err for _, msgs in self.iter_errors_grouped(is_warn=True) for err in msgs]
 
             for ind, err in enumerate(errors):
                 err_ui_list = UtilMisc.insert_ui(err)
@@ -236,7 +259,7 @@ class ErrorManager:
             elif types:
                 errors = self.get_errors(types=types)
             else:  # all errors
-                errors = self.get_errors(types=list(self._errors.keys()))
+                errors = [err for _, msgs in self.iter_errors_grouped() for err in msgs]
 
             for ind, err in enumerate(errors):
                 err_ui_list = UtilMisc.insert_ui(err)
@@ -0,0 +1,102 @@
+from math import sqrt
+
+import numpy as np
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ModuleNotFoundError:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        # without numba the functions run as plain Python
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True)
+def point_on_polyline(xs, ys, px, py, tol):
+    """
+        Checks if the point (px, py) is on the polyline with vertices (xs[i], ys[i]), within a 'tol' distance.
+        Returns a tuple (is_on_line, distance from the polyline start to the point along the polyline).
+        Compiled with numba when the package is available.
+    """
+    tol2 = tol * tol
+    acc_length = 0.0
+
+    for i in range(len(xs) - 1):
+        ax, ay = xs[i], ys[i]
+        dx, dy = xs[i + 1] - ax, ys[i + 1] - ay
+
+        seg_length2 = dx * dx + dy * dy
+        if seg_length2 == 0.0:
+            continue
+
+        # projection of the point over the segment, bounded to the segment ends
+        t = ((px - ax) * dx + (py - ay) * dy) / seg_length2
+        t = min(max(t, 0.0), 1.0)
+
+        # residual from the point to its projection, computed like the numpy version: with 't' bounded to
+        # 0 or 1, a point placed exactly on a vertex gives an exact zero (rebuilding 'ax + t * dx' may not)
+        rx, ry = (px - ax) - t * dx, (py - ay) - t * dy
+        seg_length = sqrt(seg_length2)
+
+        if rx * rx + ry * ry <= tol2:
+            return True, acc_length + t * seg_length
+
+        acc_length += seg_length
+
+    return False, 0.0
+
+
+@njit(cache=True)
+def _points_on_polyline_loop(xs, ys, pxs, pys, tol):
+    n = len(pxs)
+    on_line = np.zeros(n, dtype=np.bool_)
+    distances = np.zeros(n, dtype=np.float64)
+
+    for j in range(n):
+        on_line[j], distances[j] = point_on_polyline(xs, ys, pxs[j], pys[j], tol)
+
+    return on_line, distances
+
+
+def _points_on_polyline_numpy(xs, ys, pxs, pys, tol):
+    ax, ay = xs[:-1], ys[:-1]
+    dx, dy = xs[1:] - ax, ys[1:] - ay
+    seg_lengths2 = dx * dx + dy * dy
+    seg_lengths = np.sqrt(seg_lengths2)
+    acc_lengths = np.concatenate(([0.0], np.cumsum(seg_lengths)[:-1]))
+
+    # (points, segments) projection of every point over every segment, bounded to the segment ends
+    apx, apy = pxs[:, None] - ax[None, :], pys[:, None] - ay[None, :]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.clip((apx * dx + apy * dy) / seg_lengths2, 0.0, 1.0)
+
+    hits = (seg_lengths2 > 0.0) & ((apx - t * dx) ** 2 + (apy - t * dy) ** 2 <= tol * tol)
+
+    on_line = hits.any(axis=1)
+    first_seg = hits.argmax(axis=1)  # first segment that contains the point
+    rows = np.arange(len(pxs))
+    distances = np.where(on_line, acc_lengths[first_seg] + t[rows, first_seg] * seg_lengths[first_seg], 0.0)
+
+    return on_line, distances
+
+
+def points_on_polyline(xs, ys, pxs, pys, tol):
+    """
+        Vectorized version of 'point_on_polyline' for many points (pxs[j], pys[j]) against one polyline.
+        Returns two arrays: a boolean mask of points on the polyline and their distances from the polyline start.
+        Uses the numba compiled loop when available, otherwise a numpy (points x segments) evaluation.
+    """
+    xs, ys = np.asarray(xs, dtype=np.float64), np.asarray(ys, dtype=np.float64)
+    pxs, pys = np.asarray(pxs, dtype=np.float64), np.asarray(pys, dtype=np.float64)
+
+    if len(pxs) == 0 or len(xs) < 2:
+        return np.zeros(len(pxs), dtype=bool), np.zeros(len(pxs), dtype=np.float64)
+
+    if HAS_NUMBA:
+        return _points_on_polyline_loop(xs, ys, pxs, pys, tol)
+
+    return _points_on_polyline_numpy(xs, ys, pxs, pys, tol)
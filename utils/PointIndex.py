@@ -0,0 +1,64 @@
+from bisect import bisect_left, bisect_right
+
+try:
+    from rtree import index as rtree_index
+except ModuleNotFoundError:
+    rtree_index = None
+
+
+class PointIndex:
+    """
+        Spatial index over 2D points, used to query which points fall inside a bounding box without testing
+        all of them. If the 'rtree' package is available an R-tree is used, otherwise the points are kept sorted
+        by x-axis coordinate and the box query is resolved with binary search over x plus a y-axis filter.
+
+
+        Attributes:
+        ----------
+        keys : List[int]
+            Point keys (for example, node IDs) in insertion order.
+
+        _rtree : rtree.index.Index
+            R-tree with the points, indexed by position in 'keys'. (None if 'rtree' package is not installed).
+
+        _xs : List[float]
+            x-axis coordinates sorted (fallback index).
+
+        _ys_pos : List[Tuple[float, int]]
+            y-axis coordinate and position in 'keys' of each point, aligned with '_xs' (fallback index).
+
+
+        Methods:
+        -------
+        query(self, west, south, east, north)
+            Returns the keys of the points inside the bounding box (borders included), in insertion order.
+
+    """
+
+    def __init__(self, points=()):
+        points = [(key, x, y) for key, x, y in points]
+        self.keys = [key for key, _, _ in points]
+
+        self._rtree = None
+        self._xs = []
+        self._ys_pos = []
+
+        if rtree_index is not None:
+            self._rtree = rtree_index.Index(((pos, (x, y, x, y), None) for pos, (_, x, y) in enumerate(points)),
+                                            interleaved=True) if points else rtree_index.Index()
+        else:
+            sorted_points = sorted(enumerate(points), key=lambda point: point[1][1])
+            self._xs = [x for _, (_, x, _) in sorted_points]
+            self._ys_pos = [(y, pos) for pos, (_, _, y) in sorted_points]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def query(self, west: float, south: float, east: float, north: float):
+        if self._rtree is not None:
+            positions = self._rtree.intersection((west, south, east, north))
+        else:
+            ind_from, ind_to = bisect_left(self._xs, west), bisect_right(self._xs, east)
+            positions = [pos for y, pos in self._ys_pos[ind_from:ind_to] if south <= y <= north]
+
+        return [self.keys[pos] for pos in sorted(positions)]
@@ -12,9 +12,17 @@ class ErrorProtocol:
     El objetivo de esta clase utilitaria es proveer de los distintos metodos para manejar los errores y advertencias que ocurren
     durante la ejecucion.
 
+    Los metodos 'append_warn_msg', 'append_warn_msgs', 'append_err_msg' y 'append_err_msgs' son las variantes directas
+    de 'append_error', pensadas para los ciclos donde ya se conoce el tipo de mensaje.
+
     * Archivo de configuracion: ./config/config.json
 
     """
+    # error codes of the input paths (see 'check_input_path_errors'), the codes are fixed
+    _INPUT_REQUIRED_CODES = tuple(ConfigApp.error_codes[code] for code in ('node_file', 'arc_file', 'not_found_file',
+                                                                           'linkage_in_file', 'linkage_out_file',
+                                                                           'check_results_folder'))
+    _INPUT_ADDITIONAL_CODES = (ConfigApp.error_codes['feature_file'],)
 
     def __init__(self, config: ConfigApp, error: ErrorManager):
         self._err = error
@@ -25,16 +33,26 @@ class ErrorProtocol:
 
         if is_warn:
             if msg:
-                self._err.append(msg=msg, typ=typ, is_warn=is_warn, code=code)
+                self.append_warn_msg(msg, typ, code)
             elif msgs:
-                for msg_str in msgs:
-                    self._err.append(msg=msg_str, typ=typ, is_warn=is_warn, code=code)
+                self.append_warn_msgs(msgs, typ, code)
         else:
             if msg:
-                self._err.append(msg=msg, typ=typ, code=code)
+                self.append_err_msg(msg, typ, code)
             elif msgs:
-                for msg_str in msgs:
-                    self._err.append(msg=msg_str, typ=typ, code=code)
+                self.append_err_msgs(msgs, typ, code)
+
+    def append_warn_msg(self, msg: str, typ: str, code: str = ''):
+        self._err.append(msg, typ, True, code)
+
+    def append_warn_msgs(self, msgs: list, typ: str, code: str = ''):
+        self._err.extend(msgs, typ, True, code)
+
+    def append_err_msg(self, msg: str, typ: str, code: str = ''):
+        self._err.append(msg, typ, False, code)
+
+    def append_err_msgs(self, msgs: list, typ: str, code: str = ''):
+        self._err.extend(msgs, typ, False, code)
 
     def get_errors(self, code: str = ''):
         return self._err.get_errors(code=code)
@@ -70,25 +88,20 @@ class ErrorProtocol:
         UtilMisc.show_title(msg_title='{} SUMMARY'.format(prefix_err), title_color=ui.red)
 
         if all_errors:
-            types = self._err.get_error_types()
-            self._err.print_ui(types=types, is_warn=is_warn)
+            self._err.print_ui(is_warn=is_warn)  # all types, grouped in one pass (see 'iter_errors_grouped')
         else:
             self._err.print_ui(typ=feature_type, is_warn=is_warn)
 
     def check_input_path_errors(self, required: bool = True, additional: bool = True):
-        codes = ConfigApp.error_codes
-
-        input_codes = []
+        input_codes = ()
         if required:
-            input_codes += [codes['node_file'], codes['arc_file'], codes['not_found_file'],
-                            codes['linkage_in_file'], codes['linkage_out_file'], codes['check_results_folder']]
+            input_codes += self._INPUT_REQUIRED_CODES
         if additional:
-            input_codes.append(codes['feature_file'])
+            input_codes += self._INPUT_ADDITIONAL_CODES
 
         errors = []
         for code in input_codes:
-            err = self._err.get_errors(code=code)
-            errors = errors + err if err else errors
+            errors.extend(self._err.get_errors(code=code) or ())
 
         return errors
 
@@ -132,6 +145,20 @@ class MapFileManagerProtocol(ErrorProtocol, metaclass=ABCMeta):
     """
     feature_file_paths = {}
 
+    # input kind => (key in 'feature_file_paths[feature_type]', error code name, 'type_names' key of the feature (None:
+    # given by the caller), must be a shapefile, is a folder). Used by the 'set_*' path methods (see '_register_path')
+    _PATH_SPECS = {
+        'feature': ('path', 'feature_file', None, True, False),
+        'well': ('well_path', 'well_file', 'DemandSiteProcess', False, False),
+        'linkage_in': ('linkage_in_path', 'linkage_in_file', 'AppKernel', True, False),
+        'linkage_out': ('linkage_out_path', 'linkage_out_file', 'AppKernel', False, True),
+        'arc': ('arc_path', 'arc_file', 'GeoKernel', True, False),
+        'node': ('node_path', 'node_file', 'GeoKernel', True, False),
+    }
+    # error codes checked before processing (see 'check_input_files_error')
+    _INPUT_FILES_CODES = tuple(ConfigApp.error_codes[code] for code in ('linkage_out_file', 'linkage_in_file', 'arc_file',
+                                                                        'node_file', 'not_found_file'))
+
     @classmethod
     def build_path_structure(cls):
         if len(cls.feature_file_paths) == 0:
@@ -160,148 +187,85 @@ class MapFileManagerProtocol(ErrorProtocol, metaclass=ABCMeta):
         self.node_map_names = {}  # 'name' 'path' 'inter' 'imported'
         self.map_names = {}  # 'name' 'path' 'inter' 'inter_geo_type' 'is_main' 'imported'
         self.cells_by_map = {}  # [map_name_i] = [cell_i_1, ..., cell_i_j]
+        self._export_columns_cache = {}  # (alias, with_type, truncate, columns to save) => 'get_column_to_export'
 
         # build basic structure of path
         MapFileManagerProtocol.build_path_structure()
 
-    def set_feature_file_path(self, feature_type: str, file_path: str, is_main_file: bool = False):
-        code_error = ConfigApp.error_codes['feature_file']  # code error for feature input files
-
-        if not file_path:
-            return False, []
+    def _register_path(self, kind: str, file_path: str, feature_type: str = None, **extra):
+        container_key, code_name, type_key, needs_shp, is_folder = MapFileManagerProtocol._PATH_SPECS[kind]
+        code_error = ConfigApp.error_codes[code_name]
+        feature_type = feature_type if type_key is None else self.__config.type_names[type_key]
 
-        exist_files, _ = UtilMisc.check_paths_exist(files=[file_path])
-        if exist_files[0][0]:
-            if feature_type in MapFileManagerProtocol.feature_file_paths:
-                feature = MapFileManagerProtocol.feature_file_paths[feature_type]
-
-                # check if it is a shapefile
-                if UtilMisc.check_file_extension(file_path=file_path, ftype='shp'):
-                    map_name = UtilMisc.get_map_name_standard(f_path=file_path)  # truncate to 30 chars and lower case
-                    feature['path'][map_name] = {
-                        'name': map_name,
-                        'path': file_path,
-                        'is_main': is_main_file
-                    }
-                else:
-                    msg_error = 'El archivo [{}] no es un shapefile'.format(file_path)
-                    self.append_error(typ=feature_type, msg=msg_error, is_warn=False, code=code_error)
+        if is_folder:
+            _, exist_paths = UtilMisc.check_paths_exist(folders=[file_path])
+        else:
+            exist_paths, _ = UtilMisc.check_paths_exist(files=[file_path])
+        is_found, msg_error = exist_paths[0]
+
+        if not is_found:
+            pass  # 'msg_error' says the file/folder doesn't exist
+        elif feature_type not in MapFileManagerProtocol.feature_file_paths:
+            msg_error = 'Feature type [{}] for file [{}] is not implemented'.format(feature_type, file_path)
+        elif needs_shp and not UtilMisc.check_file_extension(file_path=file_path, ftype='shp'):
+            msg_error = 'El archivo [{}] no es un shapefile'.format(file_path)
+        else:
+            if kind == 'well':
+                map_name = os.path.splitext(os.path.basename(file_path))[0][0:30].lower()
+            elif kind == 'linkage_out':
+                file_name_full_path = os.path.join(file_path, self.__config.get_linkage_out_file_name())
+                map_name = UtilMisc.get_map_name_standard(f_path=file_name_full_path)
             else:
-                msg_error = 'Feature type [{}] for file [{}] is not implemented'.format(feature_type, file_path)
-                self.append_error(typ=feature_type, msg=msg_error, is_warn=False, code=code_error)
+                map_name = UtilMisc.get_map_name_standard(f_path=file_path)  # truncate to 30 chars and lower case
 
-        else:
-            self.append_error(typ=feature_type, msg=exist_files[0][1], is_warn=False, code=code_error)
+            MapFileManagerProtocol.feature_file_paths[feature_type][container_key][map_name] = {
+                'name': map_name,
+                'path': file_path,
+                **extra
+            }
+
+        if msg_error is not None:
+            self.append_error(typ=feature_type, msg=msg_error, is_warn=False, code=code_error)
 
         return self.check_errors(code=code_error), self.get_errors(code=code_error)
 
-    def set_demand_site_well(self, file_path: str):
+    def set_feature_file_path(self, feature_type: str, file_path: str, is_main_file: bool = False):
         if not file_path:
             return False, []
 
-        code_error = ConfigApp.error_codes['well_file']  # code error for well input file
-        feature_type = self.__config.type_names['DemandSiteProcess']
-
-        exist_files, _ = UtilMisc.check_paths_exist(files=[file_path])
-        if exist_files[0][0]:
-            well_var_path = MapFileManagerProtocol.feature_file_paths[feature_type]['well_path']
+        return self._register_path('feature', file_path, feature_type=feature_type, is_main=is_main_file)
 
-            well_name = os.path.splitext(os.path.basename(file_path))[0][0:30].lower()
-            well_var_path[well_name] = {
-                'name': well_name,
-                'path': file_path
-            }
-        else:
-            self.append_error(typ=feature_type, msg=exist_files[0][1], is_warn=False, code=code_error)
+    def set_demand_site_well(self, file_path: str):
+        if not file_path:
+            return False, []
 
-        return self.check_errors(code=code_error), self.get_errors(code=code_error)
+        return self._register_path('well', file_path)
 
     def set_linkage_out_file(self, folder_path: str):
-        code_error = ConfigApp.error_codes['linkage_out_file']   # code error for output file
-        feature_type = self.__config.type_names['AppKernel']
         if not folder_path:
             return False, []
 
-        _, exist_folders = UtilMisc.check_paths_exist(folders=[folder_path])
-
-        if exist_folders[0][0]:
-            feature = MapFileManagerProtocol.feature_file_paths[feature_type]
-
-            file_name = self.__config.get_linkage_out_file_name()
-            file_name_full_path = os.path.join(folder_path, file_name)
-
-            map_name = UtilMisc.get_map_name_standard(f_path=file_name_full_path)  # truncate to 30 chars and lower case
-            feature['linkage_out_path'][map_name] = {
-                'name': map_name,
-                'path': folder_path  # os.path.join(folder_path, map_name)
-            }
-        else:
-            # linkage-out problem with error code
-            self.append_error(typ=feature_type, msg=exist_folders[0][1], is_warn=False, code=code_error)
-
-        return self.check_errors(code=code_error), self.get_errors(code=code_error)
-    
+        return self._register_path('linkage_out', folder_path)
 
     def set_linkage_in_file(self, file_path: str):
-        code_error = ConfigApp.error_codes['linkage_in_file']  # code error for input linkage file
-        feature_type = self.__config.type_names['AppKernel']
-
         if not file_path:
             return False, []
 
-        exist_files, _ = UtilMisc.check_paths_exist(files=[file_path])
-
-        if exist_files[0][0]:
-            # check if it is a shapefile
-            if UtilMisc.check_file_extension(file_path=file_path, ftype='shp'):
-                feature = MapFileManagerProtocol.feature_file_paths[feature_type]
-
-                map_name = UtilMisc.get_map_name_standard(f_path=file_path)  # truncate to 30 chars and lower case
-                feature['linkage_in_path'][map_name] = {
-                    'name': map_name,
-                    'path': file_path
-                }
-            else:
-                msg_error = 'El archivo [{}] no es un shapefile'.format(file_path)
-                self.append_error(typ=feature_type, msg=msg_error, is_warn=False, code=code_error)
-        else:
-            # linkage-in problem with error code
-            self.append_error(typ=feature_type, msg=exist_files[0][1], is_warn=False, code=code_error)
-
-        return self.check_errors(code=code_error), self.get_errors(code=code_error)
+        return self._register_path('linkage_in', file_path)
 
     def set_geo_file_path(self, file_path: str, is_arc: bool = False, is_node: bool = False):
         if not file_path:
             return False, []
 
-        feature_type = self.__config.type_names['GeoKernel']
         if is_arc:
-            code_error = ConfigApp.error_codes['arc_file']  # code error for arc shapefile
-            feature = MapFileManagerProtocol.feature_file_paths[feature_type]['arc_path']
+            return self._register_path('arc', file_path)
         elif is_node:
-            code_error = ConfigApp.error_codes['node_file']  # code error for node shapefile
-            feature = MapFileManagerProtocol.feature_file_paths[feature_type]['node_path']
-        else:
-            feature = None
-            code_error = ConfigApp.error_codes['not_found_file']
-            msg_error = 'File [{}] must be an arc or node file. None selected.'.format(file_path)
-            self.append_error(typ=feature_type, msg=msg_error, is_warn=False)
-
-        exist_files, _ = UtilMisc.check_paths_exist(files=[file_path])
-        if feature is not None and exist_files[0][0]:
-            # check if it is a shapefile
-            if UtilMisc.check_file_extension(file_path=file_path, ftype='shp'):
-                map_name = UtilMisc.get_map_name_standard(f_path=file_path)  # truncate to 30 chars and lower case
-                feature[map_name] = {
-                    'name': map_name,
-                    'path': file_path
-                }
-            else:
-                msg_error = 'El archivo [{}] no es un shapefile'.format(file_path)
-                self.append_error(typ=feature_type, msg=msg_error, is_warn=False, code=code_error)
-        else:
-            # node/arc file problem with error code
-            self.append_error(typ=feature_type, msg=exist_files[0][1], is_warn=False, code=code_error)
+            return self._register_path('node', file_path)
+
+        feature_type = self.__config.type_names['GeoKernel']
+        code_error = ConfigApp.error_codes['not_found_file']
+        msg_error = 'File [{}] must be an arc or node file. None selected.'.format(file_path)
+        self.append_error(typ=feature_type, msg=msg_error, is_warn=False)
 
         return self.check_errors(code=code_error), self.get_errors(code=code_error)
 
@@ -366,15 +330,7 @@ class MapFileManagerProtocol(ErrorProtocol, metaclass=ABCMeta):
         return ret
 
     def check_input_files_error(self):
-        code_errors = (ConfigApp.error_codes['linkage_out_file'], ConfigApp.error_codes['linkage_in_file'],
-                       ConfigApp.error_codes['arc_file'], ConfigApp.error_codes['node_file'],
-                       ConfigApp.error_codes['not_found_file'])
-
-        error = False
-        for code_error in code_errors:
-            error = error or self.check_errors(code=code_error)
-
-        return error
+        return any(self.check_errors(code=code_error) for code_error in self._INPUT_FILES_CODES)
 
     def set_map_name(self, map_name: str, map_path: str = None, is_main_file: bool = None, map_new_name: str = None):
         if len(map_name) == 0:
@@ -467,20 +423,14 @@ class MapFileManagerProtocol(ErrorProtocol, metaclass=ABCMeta):
         return map_name in self.node_map_names
 
     def get_main_map_name(self, only_name: bool = False, imported: bool = True):
-        all_names = self.get_map_names(only_names=True, with_main_file=True, imported=imported)
-        without_main_names = self.get_map_names(only_names=True, with_main_file=False, imported=imported)
-        main_name = [e for e in all_names if e not in without_main_names]
+        # one scan, stops at the first main map
+        for map_data in self.map_names.values():
+            if not map_data['is_main'] or not map_data['name'] or (imported and not map_data['imported']):
+                continue
 
-        if len(main_name) > 0:
-            if only_name:
-                ret = self.get_map_name(map_key=main_name[0], only_name=only_name, with_main_file=True)
-            else:
-                ret = self.get_map_name(map_key=main_name[0], only_name=only_name, with_main_file=True)
-                ret = ret[0], ret[1], ret[2]
-        else:
-            ret = None if only_name else (None, None, None)
+            return map_data['name'] if only_name else (map_data['name'], map_data['path'], map_data['inter'])
 
-        return ret
+        return None if only_name else (None, None, None)
 
     def get_map_name(self, map_key: str, only_name: bool = False, with_main_file: bool = True):
         if not with_main_file:
@@ -489,7 +439,7 @@ class MapFileManagerProtocol(ErrorProtocol, metaclass=ABCMeta):
                 ret = name
             else:
                 path = self.map_names[map_key]['path'] if not self.map_names[map_key]['is_main'] else None
-                inter = self.map_names[map_key]['path'] if not self.map_names[map_key]['is_main'] else None
+                inter = self.map_names[map_key]['inter'] if not self.map_names[map_key]['is_main'] else None
                 ret = name, path, inter
         else:
             if only_name:
@@ -511,21 +461,20 @@ class MapFileManagerProtocol(ErrorProtocol, metaclass=ABCMeta):
     def get_map_path(self, map_key: str) -> str:
         return self.map_names[map_key]['path']
 
-    def get_map_names(self, only_names: bool = False, with_main_file: bool = True, imported: bool = False):
+    def get_map_names(self, only_names: bool = False, with_main_file: bool = True, imported: bool = False,
+                      non_null_only: bool = False):
         ret = []
 
-        map_names = self.map_names
-        if imported:
-            map_names = dict([(m, map_names[m]) for m in map_names if map_names[m]['imported']])
+        # the fields are read from each map entry once (no 'get_map_name' call by map)
+        for map_data in self.map_names.values():
+            if imported and not map_data['imported']:
+                continue
+            if non_null_only and not map_data['path']:  # maps without file
+                continue
+            if (not with_main_file and map_data['is_main']) or not map_data['name']:
+                continue
 
-        for m_key in map_names:
-            if only_names:
-                map_name = self.get_map_name(map_key=m_key, only_name=only_names, with_main_file=with_main_file)
-                map_info = map_name
-            else:
-                map_name, map_path, map_inter = self.get_map_name(map_key=m_key, only_name=only_names, with_main_file=with_main_file)
-                map_info = (map_name, map_path, map_inter)
-            ret.append(map_info) if map_name else None
+            ret.append(map_data['name'] if only_names else (map_data['name'], map_data['path'], map_data['inter']))
 
         return ret
 
@@ -540,21 +489,13 @@ class MapFileManagerProtocol(ErrorProtocol, metaclass=ABCMeta):
         return fields
 
     def all_files_imported(self):
+        # 'all' stops at the first map not imported
         if len(self.map_names) > 0:
-            imported = True
-            for f_key in self.map_names:  # maps
-                file_data = self.map_names[f_key]
-                imported = imported and file_data['imported']
+            imported = all(file_data['imported'] for file_data in self.map_names.values())  # maps
 
         elif len(self.arc_map_names) > 0 and len(self.node_map_names) > 0:
-            imported = True
-            for f_key in self.arc_map_names:  # arcs
-                file_data = self.arc_map_names[f_key]
-                imported = imported and file_data['imported']
-
-            for f_key in self.node_map_names:  # nodes
-                file_data = self.node_map_names[f_key]
-                imported = imported and file_data['imported']
+            imported = (all(file_data['imported'] for file_data in self.arc_map_names.values()) and  # arcs
+                        all(file_data['imported'] for file_data in self.node_map_names.values()))  # nodes
         else:
             imported = False
 
@@ -570,22 +511,42 @@ class MapFileManagerProtocol(ErrorProtocol, metaclass=ABCMeta):
             Map name used in GRASS.
 
         """
-        err, errors = False, []
+        return self.finish_vector_map(map_name, self.start_vector_map(map_name))
 
+    def _get_maps_of(self, map_name):
         if map_name in self.map_names:
-            maps = self.map_names
+            return self.map_names
         elif map_name in self.node_map_names:
-            maps = self.node_map_names
+            return self.node_map_names
         elif map_name in self.arc_map_names:
-            maps = self.arc_map_names
-        else:
-            maps = {}
-            err = True
-            errors.append("El mapa [{}] no esta registrado.".format(map_name))
+            return self.arc_map_names
+
+        return {}
+
+    def start_vector_map(self, map_name):
+        """
+        Starts the import of the vector map 'map_name' without waiting for it (see 'make_vector_map').
+        Returns the running GRASS process, or None if the map is not registered.
+
+        """
+        maps = self._get_maps_of(map_name)
 
         if map_name in maps:
+            return GrassCoreAPI.start_import_vector_map(map_path=maps[map_name]['path'], output_name=map_name)
+
+        return None
+
+    def finish_vector_map(self, map_name, process):
+        """
+        Waits for the import started by 'start_vector_map' ('process') and checks the mandatory columns of the map.
+
+        """
+        err, errors = False, []
+        maps = self._get_maps_of(map_name)
+
+        if map_name in maps and process is not None:
             path_name = maps[map_name]['path']
-            _err, _errors = GrassCoreAPI.import_vector_map(map_path=path_name, output_name=map_name)
+            _err, _errors = GrassCoreAPI.finish_import_vector_map(process, map_path=path_name, output_name=map_name)
 
             if not _err:
                 # check mandatory field
@@ -595,6 +556,9 @@ class MapFileManagerProtocol(ErrorProtocol, metaclass=ABCMeta):
             else:
                 err = _err
                 errors += _errors
+        else:
+            err = True
+            errors.append("El mapa [{}] no esta registrado.".format(map_name))
 
         return err, errors
 
@@ -622,16 +586,18 @@ class MapFileManagerProtocol(ErrorProtocol, metaclass=ABCMeta):
 
         """
         conf = self.__config
-        feature_types = list(conf.type_names.values())
+
+        # called for each cell when the linkage file is saved. The columns only change with the number of columns to
+        # save (see 'ConfigApp.set_columns_to_save'), so it is part of the cache key
+        cols_number = conf.default_opts[alias]['columns_to_save'] if alias in conf.default_opts else 1
+        cache_key = (alias, with_type, truncate, cols_number)
+        if cache_key in self._export_columns_cache:
+            return list(self._export_columns_cache[cache_key])
 
         cols_to_export = []
         if alias in conf.cols_linkage:
             col_name = conf.cols_linkage[alias]['name']
             col_type = conf.cols_linkage[alias]['type']
-            cols_number = 1
-
-            if alias in feature_types:
-                cols_number = conf.default_opts[alias]['columns_to_save']
 
             if len(col_name) > 8:
                 col_name = col_name[0:truncate]
@@ -649,13 +615,13 @@ class MapFileManagerProtocol(ErrorProtocol, metaclass=ABCMeta):
                 else:
                     cols_to_export.append(col_name)
 
+        self._export_columns_cache[cache_key] = tuple(cols_to_export)
+
         return cols_to_export
 
     def get_columns_to_export(self, with_type: bool = False, truncate: int = 8):
-        conf = self.__config
-
         cols_to_export = []
-        for col_key in conf.cols_linkage:
+        for col_key in self.__config.cols_linkage:
             cols = self.get_column_to_export(alias=col_key, with_type=with_type, truncate=truncate)
             cols_to_export += cols
 
@@ -664,16 +630,13 @@ class MapFileManagerProtocol(ErrorProtocol, metaclass=ABCMeta):
     def get_info_columns_to_export(self, feature_type: str, with_type: bool = False,  truncate: int = 8):
         col_prefix = '{}_'.format(feature_type[0].upper())
 
-        # secondary maps to info columns
-        cols_to_export = []
-        for col in self.get_map_names(only_names=True, with_main_file=False, imported=True):
-            if with_type:
-                col_name = ('{}{}'.format(col_prefix, col[0:truncate]), 'VARCHAR')
-            else:
-                col_name = '{}{}'.format(col_prefix, col[0:truncate])
-            cols_to_export.append(col_name)
+        # secondary maps (imported and not main) to info columns, in one pass over the map entries
+        col_names = [col_prefix + map_data['name'][0:truncate] for map_data in self.map_names.values()
+                     if map_data['imported'] and not map_data['is_main'] and map_data['name']]
 
-        return cols_to_export
+        if with_type:
+            return [(col_name, 'VARCHAR') for col_name in col_names]
+        return col_names
 
     @abstractmethod
     def set_map_names(self):
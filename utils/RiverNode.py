@@ -40,6 +40,10 @@ class RiverNode(NodeMixin):
         root_node : RiverNode
             RiverNode root. it is the access point to the entire segments structure.
 
+        _nodes_by_id : Dict[int, RiverNode]
+            Only used in the root node, it stores the nodes of the tree by node ID to find the main river
+            nodes without walking the whole tree (see 'set_main_river').
+
         node_id : int
             Node ID.
 
@@ -179,8 +183,10 @@ class RiverNode(NodeMixin):
     def __init__(self, node_id, node_name, node_type, node_distance, root_node=None, parent=None, children=None):
         super(RiverNode, self).__init__()
 
+        self._nodes_by_id = {}
         if root_node:
             self.root_node = root_node
+            root_node._nodes_by_id.setdefault(node_id, self)
 
         self.node_id = node_id
         self.node_name = node_name
@@ -218,7 +224,7 @@ class RiverNode(NodeMixin):
     def set_main_river(self, river_id, river_name, river_cat, river_distance):
         # make a node representing main river (parent river)
         # if not self.parent == self.root_node:
-        main_river = find_by_attr(self.root_node, name="node_id", value=river_id)
+        main_river = self.root_node._nodes_by_id.get(river_id)
 
         if not main_river:
             _river_type = 13
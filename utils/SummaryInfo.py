@@ -35,6 +35,10 @@ class SummaryInfo:
             Lista que almacena las principales tareas realizadas durante el procesamiento y su estado de exito o fracaso.
             (Estas tareas y sus mensajes se encuentran en el archivo de configuracion, en el item: 'PROCESSING LINES').
 
+        _pending : List[Tuple[str<msg_name>, str<status>, Dict[str, Any]]]
+            Tareas registradas cuyo mensaje aun no ha sido formateado. Los mensajes se construyen solo cuando las
+            lineas son leidas (ver 'flush').
+
         errors : ErrorManager
             Acceso a la instancia de los errores/advertencias del objeto (procesador) del que forma parte este summary.
 
@@ -47,6 +51,7 @@ class SummaryInfo:
 
         self.input_params = dict()
         self.process_lines = list()
+        self._pending = list()
         self.errors = errors
 
     def get_prefix(self):
@@ -59,8 +64,7 @@ class SummaryInfo:
         return self.input_params[param_name]
 
     def set_input_params(self, params: dict):
-        for param_name in params:
-            self.input_params[param_name] = params[param_name]
+        self.input_params.update(params)
 
     def get_input_params(self):
         return self.input_params
@@ -68,29 +72,32 @@ class SummaryInfo:
     def print_input_params(self):
         params_str = ''
 
-        for param_name in self.input_params:
-            s = '     [{}]: {} \n'.format(param_name, self.input_params[param_name])
+        for param_name, param_value in self.input_params.items():
+            s = '     [{}]: {} \n'.format(param_name, param_value)
             params_str += s
 
         return params_str
 
     def set_process_line(self, msg_name: str, check_error: bool, **kwargs):
-        msg_info = self.config.get_process_msg(msg_name=msg_name)
+        # the message is formatted later, only if the lines are read
         status = 'ERROR' if check_error else 'OK'
+        self._pending.append((msg_name, status, kwargs))
+
+    def flush(self):
+        for msg_name, status, kwargs in self._pending:
+            # apply parameters to message
+            msg_info = self.config.get_process_msg(msg_name=msg_name).format(**kwargs)
 
-        # apply parameters to message
-        args_dict = {}
-        for k, v in kwargs.items():
-            args_dict[k] = v
-        msg_info = msg_info.format(**args_dict)
+            line = {
+                'line': msg_info,
+                'status': status,
+            }
+            self.process_lines.append(line)
 
-        line = {
-            'line': msg_info,
-            'status': status,
-        }
-        self.process_lines.append(line)
+        self._pending.clear()
 
     def get_process_lines(self, with_ui: bool = False):
+        self.flush()
         process_lines = self.process_lines
 
         if with_ui:
@@ -114,6 +121,7 @@ class SummaryInfo:
         return process_lines
 
     def print_process_line(self):
+        self.flush()
         lines_str = ''
 
         for line_number, line in enumerate(self.process_lines):
@@ -148,21 +156,5 @@ class SummaryInfo:
 
         return warnings_str
 
-    # def append_error(self, msg: str = None, msgs: list = None, typ: str = None, is_warn: bool = False, code: str = ''):
-    #     typ = self.prefix if not typ else typ
-    #
-    #     if is_warn:
-    #         if msg:
-    #             self.errors.append(msg=msg, typ=typ, is_warn=is_warn, code=code)
-    #         elif msgs:
-    #             for msg_str in msgs:
-    #                 self.errors.append(msg=msg_str, typ=typ, is_warn=is_warn, code=code)
-    #     else:
-    #         if msg:
-    #             self.errors.append(msg=msg, typ=typ, code=code)
-    #         elif msgs:
-    #             for msg_str in msgs:
-    #                 self.errors.append(msg=msg_str, typ=typ, code=code)
-
     def get_title(self):
         return self.prefix.upper()
@@ -2,10 +2,12 @@ import difflib
 import os
 import random
 import re
+import sys
+import tempfile
 from subprocess import PIPE
 import sqlite3
 import ui
-from functools import wraps
+from functools import lru_cache, wraps
 import time
 
 from grass.pygrass.modules import Module
@@ -16,6 +18,11 @@ from grass.pygrass.utils import copy, rename, remove
 from utils.Config import ConfigApp
 from utils.RiverNode import RiverNode
 
+try:
+    from rtree import index as rtree_index
+except ModuleNotFoundError:
+    rtree_index = None
+
 
 class GrassCoreAPI:
     """
@@ -35,6 +42,12 @@ class GrassCoreAPI:
         The 'linkage_name' parameter identifies final groundwater grid and the 'snap' parameter allows to make
         the intersection more detailed (but slower).
 
+    extract_linkage_candidates(cls, map_name, linkage_name, output_name)
+        Extract to 'output_name' the grid cells of 'linkage_name' whose bounding box intersects the bounding box of
+        some geometry of 'map_name', using an R-tree over the cell boxes (built once per grid map). Used by
+        'inter_map_with_linkage' to run (v.overlay) only over the candidate cells. Returns the map name to use
+        ('linkage_name' when there is nothing to filter or the 'rtree' package is not installed).
+
     export_to_shapefile(cls, map_name, output_path, file_name: str = 'linkage.shp', verbose, quiet)
         Export an vector map as shapefile to a defined path. The 'map_name' parameter is the map name, and the path is
         defined by 'output_path' folder and 'file_name' parameters. The GRASS tool (v.out.ogr) is used to export the map.
@@ -43,14 +56,39 @@ class GrassCoreAPI:
         Using a GRASS tool (v.in.ogr) import an vector map in 'map_path' with the name defined by 'outer_name'.
         The input format is ESRI Shapefile (.shp).
 
+    start_import_vector_map(cls, map_path, output_name, verbose, quiet)
+        First part of 'import_vector_map': starts the (v.in.ogr) process without waiting it and returns the Module.
+        Several imports can run at the same time and be completed later with 'finish_import_vector_map'.
+
+    finish_import_vector_map(cls, in_ogr, map_path, output_name)
+        Second part of 'import_vector_map': waits the (v.in.ogr) process 'in_ogr', cleans the imported map and
+        returns the import error and messages.
+
+    get_attributes_by_cat(cls, vector_map, columns, key_column)
+        Read the 'columns' attribute values of all features of the open 'vector_map' with a single SELECT over
+        its attribute table (built with the pygrass table filters, ordered by category). Returns a dictionary
+        indexed by 'key_column' (category) with a tuple of values.
+
     check_basic_columns(cls, map_name, columns, needed)
         Check if 'columns' list are into metadata map 'map_name'. The list parameter 'needed' is used to set error
         or warning message.
 
+    check_basic_columns_by_column(cls, map_name, columns, needed)
+        Same check as 'check_basic_columns' reading the map columns only once, but the result is returned for each
+        column as a list of tuples (column, error, messages), in 'columns' order.
+
     create_table_attributes(cls, vector_map_name, columns_str, layer, verbose, quiet)
         Build metadata table for vector map 'vector_map_name' using 'columns_str' columns configuration. By default
         the parameter 'layer' is set to 1. The table will be created by (v.db.addtable) GRASS tool.
 
+    add_area_column(cls, map_name, column, layer, verbose, quiet)
+        Store the area of each geometry of 'map_name' vector map in the 'column' attribute column (created if it does
+        not exist), using the (v.to.db) GRASS tool. Returns the column name.
+
+    add_length_column(cls, map_name, column, layer, verbose, quiet)
+        Same as 'add_area_column', but it stores the length of the lines of 'map_name' vector map (lines sharing a
+        category are added up). Returns the column name.
+
     extract_map_with_condition(cls, map_name, output_name, col_query, val_query,  op_query, geo_check, verbose, quiet)
         Extract a subset of the geometries from the map 'map_name' to store as 'output_name' vector map name.
         The 'col_query' parameter specifies the column to query. 'op_query' parameter specifies the operator to
@@ -78,6 +116,7 @@ class GrassCoreAPI:
     verbose = None
 
     _debug_lines = []
+    _linkage_indexes = {}  # grid map name => (number of areas, R-tree of cell bounding boxes, cell categories)
 
     @classmethod
     def __set_verbosity(cls):
@@ -119,9 +158,13 @@ class GrassCoreAPI:
             overlay = Module('v.overlay', run_=False, stdout_=PIPE, stderr_=PIPE, overwrite=True)
             overlay.flags.c = True
 
+            # only grid cells whose bounding box touches some geometry of the map are intersected
+            linkage_candidates = cls.extract_linkage_candidates(map_name=map_copy_name, linkage_name=linkage_name,
+                                                                output_name=output_name + '_cells')
+
             overlay.inputs.ainput = map_copy_name
             # overlay.inputs.atype = 'area'
-            overlay.inputs.binput = linkage_name
+            overlay.inputs.binput = linkage_candidates
             # overlay.inputs.btype = 'area'
 
             overlay.inputs.operator = 'and'
@@ -135,6 +178,9 @@ class GrassCoreAPI:
             # print(overlay.outputs["stdout"].value)
             # print(overlay.outputs["stderr"].value)
 
+            if linkage_candidates != linkage_name:  # temporary map of candidate cells is no longer needed
+                cls.remove_vector_map(map_name=linkage_candidates)
+
             vector_map = Vector(output_name)
             if not vector_map.exist():
                 msg_error = 'El mapa [{}] presenta errores o no pudo ser creado por funcion [{}].'.format(overlay,
@@ -148,6 +194,95 @@ class GrassCoreAPI:
 
         return _err, _errors
 
+    @classmethod
+    def _get_linkage_index(cls, linkage_name):
+        # R-tree with the bounding boxes of the grid cells (areas), rebuilt when the grid map changes
+        linkage_map = VectorTopo(linkage_name)
+        linkage_map.open('r')
+        n_areas = linkage_map.number_of('areas')
+
+        cached = cls._linkage_indexes.get(linkage_name)
+        if cached is None or cached[0] != n_areas:
+            cell_cats = []
+            cell_boxes = []
+            for area in linkage_map.viter('areas'):
+                if area.cat is not None:
+                    bbox = area.bbox()
+                    cell_cats.append(area.cat)
+                    cell_boxes.append((bbox.west, bbox.south, bbox.east, bbox.north))
+
+            index = rtree_index.Index(((pos, box, None) for pos, box in enumerate(cell_boxes))) if cell_boxes \
+                else rtree_index.Index()
+            cached = (n_areas, index, cell_cats)
+            cls._linkage_indexes[linkage_name] = cached
+        linkage_map.close()
+
+        return cached[1], cached[2]
+
+    @classmethod
+    def remove_vector_map(cls, map_name):
+        g_remove = Module('g.remove', run_=False, stdout_=PIPE, stderr_=PIPE)
+        g_remove.inputs.type = 'vector'
+        g_remove.inputs.name = map_name
+        g_remove.flags.f = True
+
+        debug_line = g_remove.get_bash()
+        GrassCoreAPI._debug_lines.append(debug_line)
+
+        g_remove.run()
+
+    @classmethod
+    def extract_linkage_candidates(cls, map_name, linkage_name, output_name):
+        if rtree_index is None:  # without 'rtree' package the whole grid is used
+            return linkage_name
+
+        index, cell_cats = cls._get_linkage_index(linkage_name)
+
+        vector_map = VectorTopo(map_name)
+        vector_map.open('r')
+        positions = set()
+        for geo_type in ('areas', 'lines'):
+            for feature in vector_map.viter(geo_type):
+                bbox = feature.bbox()
+                positions.update(index.intersection((bbox.west, bbox.south, bbox.east, bbox.north)))
+        vector_map.close()
+
+        if not positions or len(positions) == len(cell_cats):  # nothing to filter
+            return linkage_name
+
+        cats = sorted({cell_cats[pos] for pos in positions})
+        cat_ranges = []  # 'from-to' ranges for the 'cats' parameter
+        range_from = range_to = cats[0]
+        for cat in cats[1:]:
+            if cat == range_to + 1:
+                range_to = cat
+            else:
+                cat_ranges.append((range_from, range_to))
+                range_from = range_to = cat
+        cat_ranges.append((range_from, range_to))
+
+        # the ranges go in a text file ('file' parameter), one per line: with scattered candidates a 'cats'
+        # parameter could exceed the command line length limit
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', prefix='linkage_cats_', delete=False) as cats_file:
+            cats_file.write('\n'.join(str(c_from) if c_from == c_to else '{}-{}'.format(c_from, c_to)
+                                      for c_from, c_to in cat_ranges))
+            cats_file.write('\n')
+
+        try:
+            extract = Module('v.extract', run_=False, stdout_=PIPE, stderr_=PIPE, overwrite=True)
+            extract.inputs.input = linkage_name
+            extract.inputs.file = cats_file.name
+            extract.outputs.output = output_name
+
+            debug_line = extract.get_bash()
+            GrassCoreAPI._debug_lines.append(debug_line)
+
+            extract.run()
+        finally:
+            os.remove(cats_file.name)
+
+        return output_name if Vector(output_name).exist() else linkage_name
+
     @classmethod
     def export_to_shapefile(cls, map_name, output_path, file_name: str = 'linkage.shp', verbose: bool = False,
                             quiet: bool = True):
@@ -177,15 +312,22 @@ class GrassCoreAPI:
 
     @classmethod
     def import_vector_map(cls, map_path: str, output_name: str, verbose: bool = False, quiet: bool = True):
+        in_ogr = cls.start_import_vector_map(map_path=map_path, output_name=output_name, verbose=verbose, quiet=quiet)
+
+        return cls.finish_import_vector_map(in_ogr, map_path=map_path, output_name=output_name)
+
+    @classmethod
+    def start_import_vector_map(cls, map_path: str, output_name: str, verbose: bool = False, quiet: bool = True):
         cls.__set_verbosity()
-        err = False
-        errors = []
 
         verbose = cls.verbose if cls.verbose is not None else verbose
         quiet = cls.quiet if cls.quiet is not None else quiet
 
-        # import vector map in [map_path]
-        in_ogr = Module('v.in.ogr', run_=False, stdout_=PIPE, stderr_=PIPE, overwrite=True)
+        # the map is going to be overwritten, so its cached grid index (if any) is stale
+        cls._linkage_indexes.pop(output_name, None)
+
+        # import vector map in [map_path] (the process is started and not waited)
+        in_ogr = Module('v.in.ogr', run_=False, finish_=False, stdout_=PIPE, stderr_=PIPE, overwrite=True)
 
         in_ogr.inputs.input = map_path
         in_ogr.outputs.output = output_name + '_tmp'
@@ -195,13 +337,22 @@ class GrassCoreAPI:
         GrassCoreAPI._debug_lines.append(debug_line)
 
         in_ogr.run()
+
+        return in_ogr
+
+    @classmethod
+    def finish_import_vector_map(cls, in_ogr, map_path: str, output_name: str):
+        err = False
+        errors = []
+
+        in_ogr.wait()
         # print(in_ogr.outputs["stdout"].value)
 
         # check if import works
         vector_map = Vector(output_name + '_tmp')
         if vector_map.exist():
             cls.do_clean(map_name=output_name + '_tmp', map_new_name=output_name, tool=['rmarea', 'rmline', 'rmdac'],
-                     threshold=['1', '0', '0'])
+                         threshold=['1', '0', '0'])
         else:
             err = True
             msg_error = 'El mapa [{}] en path=[{}] no pudo ser importado'.format(output_name, map_path)
@@ -255,32 +406,57 @@ class GrassCoreAPI:
 
         return col_keys, col_values
 
+    @classmethod
+    def get_attributes_by_cat(cls, vector_map, columns: list, key_column: str = 'cat'):
+        table = vector_map.table
+
+        table.filters.select(key_column, *columns).order_by(key_column)
+        try:
+            rows = table.execute().fetchall()
+        finally:
+            table.filters.reset()
+
+        return {row[0]: row[1:] for row in rows}
+
     @classmethod
     def check_basic_columns(cls, map_name, columns: list, needed: list):
         _err, _errors = False, []
 
+        for _, __err, __errors in cls.check_basic_columns_by_column(map_name=map_name, columns=columns, needed=needed):
+            _err = _err or __err
+            _errors += __errors
+
+        return _err, _errors
+
+    @classmethod
+    def check_basic_columns_by_column(cls, map_name, columns: list, needed: list):
+        results = []
+
         vector_map = VectorTopo(map_name)
         vector_map.open('r')
 
+        # columns of the map are read once for all the columns to check
         db_path = vector_map.dblinks[0].database
         cols_sqlite = Columns(vector_map.name, sqlite3.connect(db_path))
-        cols_in = cols_sqlite.items()
+        cols = {c[0] for c in cols_sqlite.items()}
 
-        cols = [c[0] for c in cols_in]
-        for ind, c_check in enumerate(columns):
-            if c_check not in cols and needed[ind]:
+        vector_map.close()
+
+        for c_check, c_needed in zip(columns, needed):
+            _err, _errors = False, []
+            if c_check not in cols and c_needed:
                 _err = True
                 msg_error = 'El mapa [{}] no tiene la columna necesaria: [{}].'.format(map_name, c_check)
                 _errors.append(msg_error)
-            elif c_check not in cols and not needed[ind]:
+            elif c_check not in cols and not c_needed:
                 _err = True
                 msg_warn = 'El mapa [{}] no tiene la columna [{}] (se ingorará su valor durante el proceso)'.format(
                     map_name, c_check)
                 _errors.append(msg_warn)
 
-        vector_map.close()
+            results.append((c_check, _err, _errors))
 
-        return _err, _errors
+        return results
 
     @classmethod
     def create_table_attributes(cls, vector_map_name, columns_str, layer=1, verbose: bool = False, quiet: bool = True):
@@ -315,6 +491,39 @@ class GrassCoreAPI:
         # print(vbuild.outputs["stdout"].value)
         # print(vbuild.outputs["stderr"].value)
 
+    @classmethod
+    def add_area_column(cls, map_name, column: str = 'inter_area', layer=1, verbose: bool = False, quiet: bool = True):
+        return cls._add_measure_column(map_name=map_name, option='area', column=column, layer=layer,
+                                       verbose=verbose, quiet=quiet)
+
+    @classmethod
+    def add_length_column(cls, map_name, column: str = 'inter_length', layer=1, verbose: bool = False,
+                          quiet: bool = True):
+        return cls._add_measure_column(map_name=map_name, option='length', column=column, layer=layer,
+                                       verbose=verbose, quiet=quiet)
+
+    @classmethod
+    def _add_measure_column(cls, map_name, option: str, column: str, layer=1, verbose: bool = False,
+                            quiet: bool = True):
+        cls.__set_verbosity()
+        verbose = cls.verbose if cls.verbose is not None else verbose
+        quiet = cls.quiet if cls.quiet is not None else quiet
+
+        # area/length of every geometry stored in the attribute table (one computation over the whole topology)
+        vtodb = Module('v.to.db', run_=False, stdout_=PIPE, stderr_=PIPE, overwrite=True)
+        vtodb.inputs.map = map_name
+        vtodb.inputs.layer = layer
+        vtodb.inputs.option = option
+        vtodb.inputs.columns = column
+
+        debug_line = vtodb.get_bash()
+        GrassCoreAPI._debug_lines.append(debug_line)
+
+        vtodb.run()
+        # print(vtodb.outputs["stdout"].value)
+
+        return column
+
     @classmethod
     def extract_map_with_condition(cls, map_name, output_name, col_query: str, val_query: str, op_query: str = '=',
                                    geo_check: str = 'point', verbose: bool = False, quiet: bool = True):
@@ -590,7 +799,13 @@ class UtilMisc:
 
 
     @staticmethod
+    @lru_cache(maxsize=None)
     def get_similarity_rate(a_words, b_words, min_rate=0.9):
+        # upper bound of 'quick_ratio' by lengths (same as 'real_quick_ratio'), skips the matcher when it can't reach 'min_rate'
+        len_a, len_b = len(a_words), len(b_words)
+        if len_a + len_b and 2.0 * min(len_a, len_b) / (len_a + len_b) < min_rate:
+            return False
+
         seq = difflib.SequenceMatcher(None, a_words, b_words)
         d = seq.quick_ratio()  # seq.ratio()
 
@@ -598,12 +813,9 @@ class UtilMisc:
 
     @staticmethod
     def check_paths_exist(files: list = None, folders: list = None):
-        import os.path
-
         files = files if files else []
         folders = folders if folders else []
 
-        # TODO: is it better to use os.path.exists?
         _result_files = []
         for file in files:
             if not os.path.isfile(file):
@@ -666,8 +878,7 @@ class UtilMisc:
     @staticmethod
     def show_title(msg_title, ch: str = '-', ch_len: int = 100, title_color=ui.green):
         count_str = ch_len - len(msg_title) if ch_len > len(msg_title) else 0
-        print()
-        print(ch * (ch_len + 2))
+        sys.stdout.write('\n' + ch * (ch_len + 2) + '\n')  # blank line and rule in one write
         ch = ' '
         ui.info_section(ui.bold, title_color, msg_title, ui.faint, ui.lightgray, ch * count_str)
 
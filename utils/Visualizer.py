@@ -1,7 +1,4 @@
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.colors as colors 
-import seaborn as sns
 
 class Visualizer:
     def __init__(self):
@@ -16,6 +13,12 @@ class Visualizer:
         
         if matrix is None:
             return
+
+        # plotting packages are slow to import, they are loaded only when an image is written
+        import matplotlib.pyplot as plt
+        import matplotlib.colors as colors
+        import seaborn as sns
+
      # Manage kwargs
         row_labels = kwargs.get('row_labels')
         column_labels = kwargs.get('column_labels')